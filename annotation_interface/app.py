@@ -3,24 +3,101 @@
 Custom Data Annotation Interface for Ansible Log Error Annotations
 """
 
+import atexit
+import bisect
+import contextlib
+import functools
 import gradio as gr
-import json
+import html
+import orjson
 import os
-from datetime import datetime
+import psycopg2.extras
+import queue
+import threading
+from collections import deque
+from datetime import datetime, timezone
 from typing import Tuple
-from sqlalchemy import create_engine, text
+from sqlalchemy import bindparam, create_engine, text
 from sqlalchemy.orm import Session
 
+FEEDBACK_TABLE_HEADER = """
+        <div style="max-height: 300px; overflow-y: auto; border: 1px solid #475569; border-radius: 8px; background-color: #1e293b;">
+            <table style="width: 100%; border-collapse: collapse; font-size: 12px; background-color: #1e293b; color: #e2e8f0;">
+                <thead style="background-color: #334155; position: sticky; top: 0;">
+                    <tr>
+                        <th style="padding: 8px; border: 1px solid #475569; color: #f1f5f9; font-weight: 600;">Index</th>
+                        <th style="padding: 8px; border: 1px solid #475569; color: #f1f5f9; font-weight: 600;">File</th>
+                        <th style="padding: 8px; border: 1px solid #475569; color: #f1f5f9; font-weight: 600;">Log</th>
+                        <th style="padding: 8px; border: 1px solid #475569; color: #f1f5f9; font-weight: 600;">Feedback</th>
+                        <th style="padding: 8px; border: 1px solid #475569; color: #f1f5f9; font-weight: 600;">Time</th>
+                    </tr>
+                </thead>
+                <tbody>
+        """
+
+# Number of entries whose details are fetched per database round trip
+ENTRY_PAGE_SIZE = 50
+
+# Number of rendered entry views kept for instant revisits
+ENTRY_VIEW_CACHE_SIZE = 256
+
+# Minimum number of appended feedback log records before the canonical file is
+# rewritten; larger feedback sets compact once the log exceeds twice their size
+FEEDBACK_COMPACT_EVERY = 50
+
+FEEDBACK_TABLE_ROW = """
+                <tr style="border-bottom: 1px solid #475569; background-color: #1e293b;" onmouseover="this.style.backgroundColor='#334155'" onmouseout="this.style.backgroundColor='#1e293b'">
+                    <td style="padding: 8px; border: 1px solid #475569; color: #e2e8f0;">{_position}</td>
+                    <td style="padding: 8px; border: 1px solid #475569; color: #e2e8f0;" title="{_filename_html}">{_filename_trunc_html}</td>
+                    <td style="padding: 8px; border: 1px solid #475569; color: #e2e8f0;" title="{_log_message_html}">{_log_message_html}</td>
+                    <td style="padding: 8px; border: 1px solid #475569; color: #e2e8f0;" title="{_feedback_html}">{_feedback_trunc_html}</td>
+                    <td style="padding: 8px; border: 1px solid #475569; color: #e2e8f0;">{_display_time}</td>
+                </tr>
+            """
+
+FEEDBACK_TABLE_FOOTER = """
+                </tbody>
+            </table>
+        </div>
+        """
+
+
+def _trunc(s: str, n: int) -> str:
+    """Truncate s to n characters, marking the cut with an ellipsis."""
+    return s if len(s) <= n else s[:n] + "..."
+
+
+def _stored_fields(feedback_entry: dict) -> dict:
+    """The entry without its in-memory "_" table display fields, for writing to disk."""
+    return {k: v for k, v in feedback_entry.items() if not k.startswith("_")}
+
 
 class DataAnnotationApp:
     def __init__(self, feedback_dir: str = "data/feedback"):
         self.feedback_dir = feedback_dir
         self.feedback_file = os.path.join(feedback_dir, "annotation.json")
+        # Append-only log of saves since the last rewrite of feedback_file
+        self.feedback_log = os.path.join(feedback_dir, "annotation.jsonl")
+        self._pending_log_writes = 0
+        # Saves are written by a background thread so clicks return immediately
+        self._save_q: queue.Queue[dict] = queue.Queue()
+        self._lock = threading.Lock()  # Guards feedback state mutations
         self.current_index = 0
-        self.data = []
+        # Positions in all_data of the entries currently shown
+        self._active_indices: range | list[int] = range(0)
         self.all_data = []  # Store all data before cluster filtering
-        self.feedback_data = []
+        self._cluster_indices = None  # One sample per cluster, loaded on first use
+        self.feedback_data = []  # Kept sorted by entry index
+        self._feedback_sorted_indices: list[int] = []  # Parallel to feedback_data
+        self._feedback_by_index: dict[int, dict] = {}  # index -> feedback entry
+        self._sorted_feedback: deque[dict] = deque()  # Most recent first
+        # Rendered feedback table HTML, reset to None whenever feedback changes
+        self._table_cache: str | None = None
+        # get_current_entry results by (index, cluster sampling), cleared
+        # whenever the data or the feedback changes
+        self._entry_view_cache: dict[tuple[int, bool], tuple] = {}
         self.show_cluster_sample = False  # Toggle state for cluster sampling
+        self._n = 0  # len(self._active_indices), kept in sync on reassignment
 
         # Get table name from environment variable
         self.table_name = os.getenv("ALERTS_TABLE_NAME", "grafanaalert")
@@ -35,21 +112,37 @@ class DataAnnotationApp:
         # Ensure data directory exists
         os.makedirs(self.feedback_dir, exist_ok=True)
 
+        # Entry details are fetched a page at a time around the current index;
+        # they are immutable once loaded, so revisits hit the cache
+        self._entry_details_page = functools.lru_cache(maxsize=16)(
+            self._query_entry_details_page
+        )
+
         self.load_data()
         self.load_feedback()
+        threading.Thread(target=self._writer_loop, daemon=True).start()
+        atexit.register(self.flush_feedback)
 
     def load_data(self):
-        """Load the pipeline output data from PostgreSQL."""
+        """Load the lightweight per-entry index from PostgreSQL.
+
+        The large text columns are fetched on demand by ``load_entry_details``.
+        """
         try:
-            with Session(self.engine) as session:
-                # Use raw SQL to query the table dynamically
-                query = text(f"""
+            with (
+                contextlib.closing(self.engine.raw_connection()) as conn,
+                conn.cursor(
+                    name="alerts_cursor",
+                    cursor_factory=psycopg2.extras.RealDictCursor,
+                ) as cur,
+            ):
+                # A named cursor is server-side: rows are streamed itersize at
+                # a time as plain dicts instead of materializing the whole
+                # result set or wrapping each record in a SQLAlchemy Row
+                cur.itersize = 2000
+                cur.execute(f"""
                     SELECT 
                         id,
-                        "logMessage",
-                        "logSummary", 
-                        "stepByStepSolution",
-                        "contextForStepByStepSolution",
                         "logCluster",
                         "log_labels",
                         "needMoreContext"
@@ -57,44 +150,26 @@ class DataAnnotationApp:
                     ORDER BY id
                 """)
 
-                result = session.execute(query)
-                rows = result.fetchall()
-
-                # Convert to the expected data format
+                # Convert to the expected data format; every selected column is
+                # always present. log_labels is kept as returned and only
+                # decoded by _entry_labels when an entry is annotated
                 self.all_data = []
-                for row in rows:
-                    # Parse labels JSON if it exists
-                    labels = (
-                        row.log_labels
-                        if hasattr(row, "labels") and row.log_labels
-                        else {}
+                for row in cur:
+                    self.all_data.append(
+                        {
+                            "id": row["id"],
+                            "log_labels": row["log_labels"],
+                            "log_cluster": row["logCluster"],
+                            "need_more_context": row["needMoreContext"] or False,
+                        }
                     )
 
-                    data_entry = {
-                        "id": row.id,
-                        "filename": labels.get("filename", "unknown")
-                        if isinstance(labels, dict)
-                        else "unknown",
-                        "line_number": labels.get("line_number", "")
-                        if isinstance(labels, dict)
-                        else "",
-                        "logMessage": row.logMessage or "No log content",
-                        "summary": row.logSummary or "No summary available",
-                        "context_for_solution": row.contextForStepByStepSolution
-                        or "No context available",
-                        "step_by_step_solution": row.stepByStepSolution
-                        or "No solution available",
-                        "log_cluster": row.logCluster
-                        if hasattr(row, "logCluster")
-                        else None,
-                        "need_more_context": row.needMoreContext
-                        if hasattr(row, "needMoreContext")
-                        else False,
-                    }
-                    self.all_data.append(data_entry)
-
                 # Initialize data with all entries
-                self.data = self.all_data.copy()
+                self._active_indices = range(len(self.all_data))
+                self._n = len(self._active_indices)
+                self._cluster_indices = None
+                self._entry_details_page.cache_clear()
+                self._entry_view_cache.clear()
 
                 print(
                     f"Loaded {len(self.all_data)} data entries from table '{self.table_name}'"
@@ -102,20 +177,200 @@ class DataAnnotationApp:
         except Exception as e:
             print(f"Error loading data from database table '{self.table_name}': {e}")
             self.all_data = []
-            self.data = []
+            self._active_indices = range(0)
+            self._n = len(self._active_indices)
+
+    def _entry_at(self, index: int) -> dict:
+        """Return the shown entry at index."""
+        return self.all_data[self._active_indices[index]]
+
+    @staticmethod
+    def _entry_labels(entry: dict) -> dict:
+        """Return the entry's log labels, decoding a raw JSON value on first use."""
+        labels = entry["log_labels"]
+        if not isinstance(labels, dict):
+            labels = orjson.loads(labels) if labels else {}
+            entry["log_labels"] = labels
+        return labels
+
+    def load_entry_details(self, index: int) -> dict:
+        """Fetch the log message and generated outputs for the entry at index."""
+        page = index // ENTRY_PAGE_SIZE
+        try:
+            page_details = self._entry_details_page(page, self.show_cluster_sample)
+        except Exception as e:
+            # Not cached, so the next visit retries the query
+            print(f"Error loading entries page {page} from '{self.table_name}': {e}")
+            return {}
+        return page_details.get(self._entry_at(index)["id"], {})
+
+    def _query_entry_details_page(
+        self, page: int, show_cluster_sample: bool
+    ) -> dict[int, dict]:
+        """Fetch details for one page of the shown entries, keyed by entry id.
+
+        show_cluster_sample is only part of the cache key, as each mode pages
+        through a different list of entries.
+        """
+        page_ids = [
+            self.all_data[i]["id"]
+            for i in self._active_indices[
+                page * ENTRY_PAGE_SIZE : (page + 1) * ENTRY_PAGE_SIZE
+            ]
+        ]
+        if not page_ids:
+            return {}
+
+        with Session(self.engine) as session:
+            query = text(f"""
+                SELECT
+                    id,
+                    "logMessage",
+                    "logSummary",
+                    "stepByStepSolution",
+                    "contextForStepByStepSolution"
+                FROM {self.table_name}
+                WHERE id IN :ids
+            """).bindparams(bindparam("ids", expanding=True))
+            rows = session.execute(query, {"ids": page_ids})
+
+            return {
+                row.id: {
+                    "logMessage": row.logMessage or "No log content",
+                    "summary": row.logSummary or "No summary available",
+                    "context_for_solution": row.contextForStepByStepSolution
+                    or "No context available",
+                    "step_by_step_solution": row.stepByStepSolution
+                    or "No solution available",
+                }
+                for row in rows
+            }
 
     def load_feedback(self):
         """Load existing feedback data."""
         try:
             if os.path.exists(self.feedback_file):
-                with open(self.feedback_file, "r") as f:
-                    self.feedback_data = json.load(f)
+                with open(self.feedback_file, "rb") as f:
+                    self.feedback_data = orjson.loads(f.read())
             else:
                 self.feedback_data = []
         except Exception as e:
             print(f"Error loading feedback: {e}")
             self.feedback_data = []
 
+        self._feedback_by_index = {f["index"]: f for f in self.feedback_data}
+        self._replay_feedback_log()
+        self.feedback_data = sorted(
+            self._feedback_by_index.values(), key=lambda x: x["index"]
+        )
+        self._feedback_sorted_indices = [f["index"] for f in self.feedback_data]
+
+        # Table display fields (including the local display time) are kept in
+        # memory only, so compute them on load, replacing any that files from
+        # earlier builds still carry
+        for f in self.feedback_data:
+            self._add_display_fields(f)
+
+        self._sorted_feedback = deque(
+            sorted(self.feedback_data, key=lambda x: x["timestamp"], reverse=True)
+        )
+        self._table_cache = None
+        self._entry_view_cache.clear()
+
+    def _replay_feedback_log(self):
+        """Apply saves appended to the feedback log since the last compaction."""
+        if not os.path.exists(self.feedback_log):
+            return
+
+        with open(self.feedback_log, "rb") as f:
+            for line in f:
+                try:
+                    record = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    # Skip blank or partially written lines
+                    continue
+                # Later records win; re-insert so the entry moves to the end
+                self._feedback_by_index.pop(record["index"], None)
+                if not record.get("deleted"):
+                    self._feedback_by_index[record["index"]] = record
+                self._pending_log_writes += 1
+
+    def _writer_loop(self):
+        """Append queued feedback records to the log, coalescing bursts of saves."""
+        while True:
+            records = [self._save_q.get()]
+            while True:
+                try:
+                    records.append(self._save_q.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                with open(self.feedback_log, "ab") as f:
+                    f.write(b"".join(orjson.dumps(r) + b"\n" for r in records))
+                self._pending_log_writes += len(records)
+                if self._pending_log_writes >= max(
+                    FEEDBACK_COMPACT_EVERY, 2 * len(self.feedback_data)
+                ):
+                    self.compact_feedback()
+            except Exception as e:
+                print(f"Error saving feedback: {e}")
+            finally:
+                for _ in records:
+                    self._save_q.task_done()
+
+    def flush_feedback(self):
+        """Wait for queued saves to be written, then compact the feedback log."""
+        self._save_q.join()
+        self.compact_feedback()
+
+    def compact_feedback(self):
+        """Rewrite the canonical feedback file and truncate the append log."""
+        if not self._pending_log_writes:
+            return
+
+        with self._lock:
+            snapshot = [_stored_fields(f) for f in self.feedback_data]
+
+        try:
+            # Write to a temp file and swap it in so a crash never truncates
+            # the canonical feedback file
+            tmp_file = self.feedback_file + ".tmp"
+            with open(tmp_file, "wb") as f:
+                f.write(
+                    orjson.dumps(
+                        snapshot,
+                        option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE,
+                    )
+                )
+            os.replace(tmp_file, self.feedback_file)
+            if os.path.exists(self.feedback_log):
+                os.remove(self.feedback_log)
+            self._pending_log_writes = 0
+        except Exception as e:
+            print(f"Error compacting feedback: {e}")
+
+    @staticmethod
+    def _add_display_fields(feedback_entry: dict, timestamp: datetime | None = None):
+        """Precompute the escaped/truncated strings shown in the feedback table.
+
+        Pass the entry's timestamp when it is at hand to skip re-parsing it.
+        """
+        feedback = feedback_entry["feedback"]
+        filename = feedback_entry["filename"]
+        if timestamp is None:
+            timestamp = datetime.fromisoformat(feedback_entry["timestamp"])
+        feedback_entry["_position"] = feedback_entry["index"] + 1
+        # Timestamps are stored in UTC; show them in local time
+        feedback_entry["_display_time"] = timestamp.astimezone().strftime("%m/%d %H:%M")
+        feedback_entry["_feedback_html"] = html.escape(feedback)
+        feedback_entry["_feedback_trunc_html"] = html.escape(
+            _trunc(feedback.strip(), 50)
+        )
+        feedback_entry["_filename_html"] = html.escape(filename)
+        feedback_entry["_filename_trunc_html"] = html.escape(_trunc(filename, 20))
+        feedback_entry["_log_message_html"] = html.escape(feedback_entry["logMessage"])
+
     def toggle_cluster_sampling(
         self, show_sample: bool
     ) -> Tuple[str, str, str, str, str, str, str, str, str, bool, bool, str]:
@@ -123,31 +378,51 @@ class DataAnnotationApp:
         self.show_cluster_sample = show_sample
 
         if show_sample:
-            # Group by cluster and take one sample from each
-            cluster_samples = {}
-            for entry in self.all_data:
-                cluster_id = entry.get("log_cluster")
-                # If no cluster, treat each entry as its own cluster
-                if cluster_id is None:
-                    cluster_id = f"_no_cluster_{entry.get('id')}"
-
-                # Keep only the first entry from each cluster
-                if cluster_id not in cluster_samples:
-                    cluster_samples[cluster_id] = entry
-
-            self.data = list(cluster_samples.values())
+            if self._cluster_indices is None:
+                self._cluster_indices = self._load_cluster_samples()
+            self._active_indices = self._cluster_indices or []
+            self._n = len(self._active_indices)
             print(
-                f"Cluster sampling enabled: Showing {len(self.data)} samples from {len(self.all_data)} total entries"
+                f"Cluster sampling enabled: Showing {len(self._active_indices)} samples from {len(self.all_data)} total entries"
             )
         else:
             # Show all data
-            self.data = self.all_data.copy()
-            print(f"Cluster sampling disabled: Showing all {len(self.data)} entries")
+            self._active_indices = range(len(self.all_data))
+            self._n = len(self._active_indices)
+            print(
+                f"Cluster sampling disabled: Showing all {len(self._active_indices)} entries"
+            )
 
         # Reset to first entry
         self.current_index = 0
         return self.get_current_entry()
 
+    def _load_cluster_samples(self) -> list[int] | None:
+        """Select the first entry of each log cluster in PostgreSQL.
+
+        Returns the positions of the sampled entries in all_data.
+        """
+        try:
+            with Session(self.engine) as session:
+                # If no cluster, treat each entry as its own cluster
+                query = text(f"""
+                    SELECT id FROM (
+                        SELECT DISTINCT ON (
+                            COALESCE("logCluster", '_no_cluster_' || id)
+                        ) id
+                        FROM {self.table_name}
+                        ORDER BY COALESCE("logCluster", '_no_cluster_' || id), id
+                    ) samples
+                    ORDER BY id
+                """)
+                sample_ids = session.execute(query).scalars().all()
+        except Exception as e:
+            print(f"Error loading cluster samples from '{self.table_name}': {e}")
+            return None
+
+        position_by_id = {entry["id"]: i for i, entry in enumerate(self.all_data)}
+        return [position_by_id[i] for i in sample_ids if i in position_by_id]
+
     def save_feedback(
         self,
         feedback: str,
@@ -157,53 +432,64 @@ class DataAnnotationApp:
         need_more_context_reason: str = "",
     ) -> str:
         """Save feedback, golden solution, expected behavior, and need more context info for current data entry."""
-        if not self.data:
+        if not self._active_indices:
             return "No data available"
 
-        current_entry = self.data[self.current_index]
+        labels = self._entry_labels(self._entry_at(self.current_index))
+        details = self.load_entry_details(self.current_index)
+        timestamp = datetime.now(timezone.utc)
 
         # Create feedback entry
         feedback_entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp.isoformat(timespec="seconds"),
             "index": self.current_index,
-            "filename": current_entry.get("filename", ""),
-            "line_number": current_entry.get("line_number", ""),
+            "filename": labels.get("filename", "unknown"),
+            "line_number": labels.get("line_number", ""),
             "feedback": feedback,
             "golden_solution": golden_solution,
             "expected_behavior": expected_behavior,
             "need_more_context": need_more_context,
             "need_more_context_reason": need_more_context_reason,
-            "logMessage": current_entry.get("logMessage", "No line context"),
+            "logMessage": details.get("logMessage", "No line context"),
         }
+        self._add_display_fields(feedback_entry, timestamp)
+
+        with self._lock:
+            # Remove any existing feedback for this entry
+            pos = bisect.bisect_left(self._feedback_sorted_indices, self.current_index)
+            previous_entry = self._feedback_by_index.pop(self.current_index, None)
+            if previous_entry is not None:
+                self._sorted_feedback.remove(previous_entry)
+                self._feedback_sorted_indices.pop(pos)
+                self.feedback_data.pop(pos)
+
+            # Add new feedback if not empty (either feedback, golden_solution, expected_behavior, or need_more_context info)
+            if (
+                feedback.strip()
+                or golden_solution.strip()
+                or expected_behavior.strip()
+                or need_more_context
+                or need_more_context_reason.strip()
+            ):
+                self._feedback_by_index[self.current_index] = feedback_entry
+                self._sorted_feedback.appendleft(feedback_entry)
+                self._feedback_sorted_indices.insert(pos, self.current_index)
+                self.feedback_data.insert(pos, feedback_entry)
+                log_record = feedback_entry
+            else:
+                log_record = {"index": self.current_index, "deleted": True}
+            self._table_cache = None
+            self._entry_view_cache.clear()
 
-        # Remove any existing feedback for this entry
-        self.feedback_data = [
-            f for f in self.feedback_data if f["index"] != self.current_index
-        ]
-
-        # Add new feedback if not empty (either feedback, golden_solution, expected_behavior, or need_more_context info)
-        if (
-            feedback.strip()
-            or golden_solution.strip()
-            or expected_behavior.strip()
-            or need_more_context
-            or need_more_context_reason.strip()
-        ):
-            self.feedback_data.append(feedback_entry)
-
-        # Save to file
-        try:
-            with open(self.feedback_file, "w") as f:
-                json.dump(self.feedback_data, f, indent=2)
-            return f"Feedback saved for entry {self.current_index + 1}"
-        except Exception as e:
-            return f"Error saving feedback: {e}"
+        # Written to the feedback log by the background writer thread
+        self._save_q.put(_stored_fields(log_record))
+        return f"Feedback saved for entry {self.current_index + 1}"
 
     def get_current_entry(
         self,
     ) -> Tuple[str, str, str, str, str, str, str, str, str, bool, bool, str]:
         """Get current data entry for display."""
-        if not self.data:
+        if not self._active_indices:
             return (
                 "No data",
                 "No data",
@@ -219,23 +505,29 @@ class DataAnnotationApp:
                 "",
             )
 
-        entry = self.data[self.current_index]
+        cache_key = (self.current_index, self.show_cluster_sample)
+        cached = self._entry_view_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        entry = self._entry_at(self.current_index)
+        details = self.load_entry_details(self.current_index)
 
         # Format error log with syntax highlighting
-        log_content = entry.get("logMessage", "No log content")
+        log_content = details.get("logMessage", "No log content")
 
         # Format summary
-        summary = entry.get("summary", "No summary available")
+        summary = details.get("summary", "No summary available")
 
         # Get context for solution
-        context_for_solution = entry.get(
+        context_for_solution = details.get(
             "context_for_solution",
             "No context available",
         )
 
         # For now, use a placeholder for step-by-step solution
         # In the future, you can extend this to fetch from your database or add it to your JSON
-        step_by_step = entry.get(
+        step_by_step = details.get(
             "step_by_step_solution",
             "Step-by-step solution not available for this entry.\n\n"
             "This would typically contain:\n"
@@ -249,26 +541,17 @@ class DataAnnotationApp:
         db_need_more_context = entry.get("need_more_context", False)
 
         # Get existing feedback, golden solution, expected behavior, and need more context info for this entry
-        existing_feedback = ""
-        existing_golden_solution = ""
-        existing_expected_behavior = ""
-        existing_need_more_context = False
-        existing_need_more_context_reason = ""
-        for f in self.feedback_data:
-            if f["index"] == self.current_index:
-                existing_feedback = f.get("feedback", "")
-                existing_golden_solution = f.get("golden_solution", "")
-                existing_expected_behavior = f.get("expected_behavior", "")
-                existing_need_more_context = f.get("need_more_context", False)
-                existing_need_more_context_reason = f.get(
-                    "need_more_context_reason", ""
-                )
-                break
+        f = self._feedback_by_index.get(self.current_index, {})
+        existing_feedback = f.get("feedback", "")
+        existing_golden_solution = f.get("golden_solution", "")
+        existing_expected_behavior = f.get("expected_behavior", "")
+        existing_need_more_context = f.get("need_more_context", False)
+        existing_need_more_context_reason = f.get("need_more_context_reason", "")
 
         # Navigation info
-        nav_info = f"{self.current_index + 1} / {len(self.data)}"
+        nav_info = f"{self.current_index + 1} / {self._n}"
 
-        return (
+        result = (
             log_content,
             summary,
             context_for_solution,
@@ -283,79 +566,56 @@ class DataAnnotationApp:
             existing_need_more_context_reason,  # from user annotation
         )
 
+        # Don't cache failed detail loads so the next visit retries them
+        if details:
+            if len(self._entry_view_cache) >= ENTRY_VIEW_CACHE_SIZE:
+                # Evict the oldest view
+                self._entry_view_cache.pop(next(iter(self._entry_view_cache)))
+            self._entry_view_cache[cache_key] = result
+        return result
+
     def navigate(
         self, direction: int
     ) -> Tuple[str, str, str, str, str, str, str, str, str, bool, bool, str]:
         """Navigate through data entries."""
-        if not self.data:
+        if not self._active_indices:
             return self.get_current_entry()
 
-        self.current_index = max(
-            0, min(len(self.data) - 1, self.current_index + direction)
-        )
+        i = self.current_index + direction
+        last = self._n - 1
+        self.current_index = 0 if i < 0 else (last if i > last else i)
         return self.get_current_entry()
 
     def go_to_index(
         self, index: int
     ) -> Tuple[str, str, str, str, str, str, str, str, str, bool, bool, str]:
         """Jump to specific index."""
-        if not self.data:
+        if not self._active_indices:
             return self.get_current_entry()
 
-        self.current_index = max(0, min(len(self.data) - 1, index))
+        last = self._n - 1
+        self.current_index = 0 if index < 0 else (last if index > last else index)
         return self.get_current_entry()
 
     def get_feedback_table(self) -> str:
-        """Generate HTML table of all feedback."""
+        """Generate HTML table of all feedback, re-rendering only after changes."""
+        if self._table_cache is None:
+            self._table_cache = self._render_feedback_table()
+        return self._table_cache
+
+    def _render_feedback_table(self) -> str:
+        """Render the HTML table of all feedback."""
         if not self.feedback_data:
             return "<div style='padding: 20px; text-align: center; color: #94a3b8; background-color: #1e293b; border: 1px solid #475569; border-radius: 8px;'>No feedback entries yet</div>"
 
-        # Sort by timestamp (most recent first)
-        sorted_feedback = sorted(
-            self.feedback_data, key=lambda x: x["timestamp"], reverse=True
-        )
+        parts = [FEEDBACK_TABLE_HEADER]
 
-        html = """
-        <div style="max-height: 300px; overflow-y: auto; border: 1px solid #475569; border-radius: 8px; background-color: #1e293b;">
-            <table style="width: 100%; border-collapse: collapse; font-size: 12px; background-color: #1e293b; color: #e2e8f0;">
-                <thead style="background-color: #334155; position: sticky; top: 0;">
-                    <tr>
-                        <th style="padding: 8px; border: 1px solid #475569; color: #f1f5f9; font-weight: 600;">Index</th>
-                        <th style="padding: 8px; border: 1px solid #475569; color: #f1f5f9; font-weight: 600;">File</th>
-                        <th style="padding: 8px; border: 1px solid #475569; color: #f1f5f9; font-weight: 600;">Log</th>
-                        <th style="padding: 8px; border: 1px solid #475569; color: #f1f5f9; font-weight: 600;">Feedback</th>
-                        <th style="padding: 8px; border: 1px solid #475569; color: #f1f5f9; font-weight: 600;">Time</th>
-                    </tr>
-                </thead>
-                <tbody>
-        """
-
-        for feedback in sorted_feedback:
-            timestamp = datetime.fromisoformat(feedback["timestamp"]).strftime(
-                "%m/%d %H:%M"
-            )
-            feedback_text = (
-                feedback["feedback"][:50] + "..."
-                if len(feedback["feedback"]) > 50
-                else feedback["feedback"]
-            )
-
-            html += f"""
-                <tr style="border-bottom: 1px solid #475569; background-color: #1e293b;" onmouseover="this.style.backgroundColor='#334155'" onmouseout="this.style.backgroundColor='#1e293b'">
-                    <td style="padding: 8px; border: 1px solid #475569; color: #e2e8f0;">{feedback["index"] + 1}</td>
-                    <td style="padding: 8px; border: 1px solid #475569; color: #e2e8f0;" title="{feedback["filename"]}">{feedback["filename"][:20]}...</td>
-                    <td style="padding: 8px; border: 1px solid #475569; color: #e2e8f0;" title="{feedback["logMessage"]}">{feedback["logMessage"]}</td>
-                    <td style="padding: 8px; border: 1px solid #475569; color: #e2e8f0;" title="{feedback["feedback"]}">{feedback_text}</td>
-                    <td style="padding: 8px; border: 1px solid #475569; color: #e2e8f0;">{timestamp}</td>
-                </tr>
-            """
+        # Already kept in timestamp order (most recent first)
+        for feedback in self._sorted_feedback:
+            parts.append(FEEDBACK_TABLE_ROW.format_map(feedback))
 
-        html += """
-                </tbody>
-            </table>
-        </div>
-        """
-        return html
+        parts.append(FEEDBACK_TABLE_FOOTER)
+        return "".join(parts)
 
 
 def create_app():
@@ -689,41 +949,20 @@ def create_app():
                 label="Status", interactive=False, lines=1, scale=2
             )
 
-        # Initialize the interface
-        def init_interface():
-            result = app.get_current_entry()
-            # Extract the db_need_more_context value (index 9) from database
-            db_need_more_context = result[9]
-            # Create HTML badge for need_more_context display
+        def need_context_badge(db_need_more_context):
+            """Create HTML badge for need_more_context display."""
             badge_class = (
                 "need-context-true" if db_need_more_context else "need-context-false"
             )
             badge_text = "Yes" if db_need_more_context else "No"
-            badge_html = f"<div class='need-context-badge {badge_class}'>🤖 AI Assessment - Need More Context: {badge_text}</div>"
+            return f"<div class='need-context-badge {badge_class}'>🤖 AI Assessment - Need More Context: {badge_text}</div>"
+
+        def entry_updates(result):
             # Return all values except db_need_more_context (index 9), plus the badge_html
             # result[:9] = first 9 items, result[10:] = items 10 and 11 (user annotations)
-            return result[:9] + result[10:] + (badge_html,)
+            return result[:9] + result[10:] + (need_context_badge(result[9]),)
 
-        # Event handlers
-        def handle_save_feedback(
-            feedback,
-            golden_solution,
-            expected_behavior,
-            need_more_context,
-            need_more_context_reason,
-        ):
-            status = app.save_feedback(
-                feedback,
-                golden_solution,
-                expected_behavior,
-                need_more_context,
-                need_more_context_reason,
-            )
-            return status
-
-        def handle_navigate_prev(
-            show_outputs, show_summary, show_context, show_solution
-        ):
+        def navigation_updates(result, show_summary, show_context, show_solution):
             (
                 log_content,
                 summary_content,
@@ -737,25 +976,20 @@ def create_app():
                 db_need_more_context,
                 user_need_more_context,
                 user_need_more_context_reason,
-            ) = app.navigate(-1)
-            # Create HTML badge for need_more_context display
-            badge_class = (
-                "need-context-true" if db_need_more_context else "need-context-false"
-            )
-            badge_text = "Yes" if db_need_more_context else "No"
-            badge_html = f"<div class='need-context-badge {badge_class}'>🤖 AI Assessment - Need More Context: {badge_text}</div>"
-            # Return content updates with visibility + preserved toggle states
+            ) = result
+            # Return content updates with visibility; toggles, titles and the
+            # outputs section are unchanged by navigation, so send no-op updates
             return (
                 log_content,  # error_log
-                gr.update(visible=show_summary),  # summary_title
+                gr.update(),  # summary_title
                 gr.update(
                     value=summary_content, visible=show_summary
                 ),  # summary with visibility
-                gr.update(visible=show_context),  # context_title
+                gr.update(),  # context_title
                 gr.update(
                     value=context_content, visible=show_context
                 ),  # context_for_solution with visibility
-                gr.update(visible=show_solution),  # solution_title
+                gr.update(),  # solution_title
                 gr.update(
                     value=step_content, visible=show_solution
                 ),  # step_by_step with visibility
@@ -763,150 +997,54 @@ def create_app():
                 golden,  # golden_solution_text
                 expected,  # expected_behavior_text
                 nav,  # nav_info
-                show_outputs,  # preserve show_outputs_toggle
-                show_summary,  # preserve show_summary_toggle
-                show_context,  # preserve show_context_toggle
-                show_solution,  # preserve show_solution_toggle
-                gr.update(visible=show_outputs),  # outputs_section visibility
+                gr.update(),  # show_outputs_toggle
+                gr.update(),  # show_summary_toggle
+                gr.update(),  # show_context_toggle
+                gr.update(),  # show_solution_toggle
+                gr.update(),  # outputs_section
                 raw_step,  # step_by_step_raw
-                badge_html,  # db_need_more_context_display
+                need_context_badge(
+                    db_need_more_context
+                ),  # db_need_more_context_display
                 user_need_more_context,  # need_more_context_toggle
                 user_need_more_context_reason,  # need_more_context_reason
             )
 
-        def handle_navigate_next(
-            show_outputs, show_summary, show_context, show_solution
+        # Initialize the interface
+        def init_interface():
+            return entry_updates(app.get_current_entry())
+
+        # Event handlers
+        def handle_save_feedback(
+            feedback,
+            golden_solution,
+            expected_behavior,
+            need_more_context,
+            need_more_context_reason,
         ):
-            (
-                log_content,
-                summary_content,
-                context_content,
-                step_content,
+            status = app.save_feedback(
                 feedback,
-                golden,
-                expected,
-                nav,
-                raw_step,
-                db_need_more_context,
-                user_need_more_context,
-                user_need_more_context_reason,
-            ) = app.navigate(1)
-            # Create HTML badge for need_more_context display
-            badge_class = (
-                "need-context-true" if db_need_more_context else "need-context-false"
+                golden_solution,
+                expected_behavior,
+                need_more_context,
+                need_more_context_reason,
             )
-            badge_text = "Yes" if db_need_more_context else "No"
-            badge_html = f"<div class='need-context-badge {badge_class}'>🤖 AI Assessment - Need More Context: {badge_text}</div>"
-            # Return content updates with visibility + preserved toggle states
-            return (
-                log_content,  # error_log
-                gr.update(visible=show_summary),  # summary_title
-                gr.update(
-                    value=summary_content, visible=show_summary
-                ),  # summary with visibility
-                gr.update(visible=show_context),  # context_title
-                gr.update(
-                    value=context_content, visible=show_context
-                ),  # context_for_solution with visibility
-                gr.update(visible=show_solution),  # solution_title
-                gr.update(
-                    value=step_content, visible=show_solution
-                ),  # step_by_step with visibility
-                feedback,  # feedback_text
-                golden,  # golden_solution_text
-                expected,  # expected_behavior_text
-                nav,  # nav_info
-                show_outputs,  # preserve show_outputs_toggle
-                show_summary,  # preserve show_summary_toggle
-                show_context,  # preserve show_context_toggle
-                show_solution,  # preserve show_solution_toggle
-                gr.update(visible=show_outputs),  # outputs_section visibility
-                raw_step,  # step_by_step_raw
-                badge_html,  # db_need_more_context_display
-                user_need_more_context,  # need_more_context_toggle
-                user_need_more_context_reason,  # need_more_context_reason
+            return status
+
+        def handle_navigate(direction, show_summary, show_context, show_solution):
+            return navigation_updates(
+                app.navigate(direction), show_summary, show_context, show_solution
             )
 
-        def handle_jump(index, show_outputs, show_summary, show_context, show_solution):
+        def handle_jump(index, show_summary, show_context, show_solution):
             if index is not None:
-                (
-                    log_content,
-                    summary_content,
-                    context_content,
-                    step_content,
-                    feedback,
-                    golden,
-                    expected,
-                    nav,
-                    raw_step,
-                    db_need_more_context,
-                    user_need_more_context,
-                    user_need_more_context_reason,
-                ) = app.go_to_index(int(index) - 1)
+                result = app.go_to_index(int(index) - 1)
             else:
-                (
-                    log_content,
-                    summary_content,
-                    context_content,
-                    step_content,
-                    feedback,
-                    golden,
-                    expected,
-                    nav,
-                    raw_step,
-                    db_need_more_context,
-                    user_need_more_context,
-                    user_need_more_context_reason,
-                ) = app.get_current_entry()
-            # Create HTML badge for need_more_context display
-            badge_class = (
-                "need-context-true" if db_need_more_context else "need-context-false"
-            )
-            badge_text = "Yes" if db_need_more_context else "No"
-            badge_html = f"<div class='need-context-badge {badge_class}'>🤖 AI Assessment - Need More Context: {badge_text}</div>"
-            # Return content updates with visibility + preserved toggle states
-            return (
-                log_content,  # error_log
-                gr.update(visible=show_summary),  # summary_title
-                gr.update(
-                    value=summary_content, visible=show_summary
-                ),  # summary with visibility
-                gr.update(visible=show_context),  # context_title
-                gr.update(
-                    value=context_content, visible=show_context
-                ),  # context_for_solution with visibility
-                gr.update(visible=show_solution),  # solution_title
-                gr.update(
-                    value=step_content, visible=show_solution
-                ),  # step_by_step with visibility
-                feedback,  # feedback_text
-                golden,  # golden_solution_text
-                expected,  # expected_behavior_text
-                nav,  # nav_info
-                show_outputs,  # preserve show_outputs_toggle
-                show_summary,  # preserve show_summary_toggle
-                show_context,  # preserve show_context_toggle
-                show_solution,  # preserve show_solution_toggle
-                gr.update(visible=show_outputs),  # outputs_section visibility
-                raw_step,  # step_by_step_raw
-                badge_html,  # db_need_more_context_display
-                user_need_more_context,  # need_more_context_toggle
-                user_need_more_context_reason,  # need_more_context_reason
-            )
+                result = app.get_current_entry()
+            return navigation_updates(result, show_summary, show_context, show_solution)
 
         def handle_cluster_toggle(show_sample):
-            result = app.toggle_cluster_sampling(show_sample)
-            # Extract the db_need_more_context value (index 9) from database
-            db_need_more_context = result[9]
-            # Create HTML badge for need_more_context display
-            badge_class = (
-                "need-context-true" if db_need_more_context else "need-context-false"
-            )
-            badge_text = "Yes" if db_need_more_context else "No"
-            badge_html = f"<div class='need-context-badge {badge_class}'>🤖 AI Assessment - Need More Context: {badge_text}</div>"
-            # Return all values except db_need_more_context (index 9), plus the badge_html
-            # result[:9] = first 9 items, result[10:] = items 10 and 11 (user annotations)
-            return result[:9] + result[10:] + (badge_html,)
+            return entry_updates(app.toggle_cluster_sampling(show_sample))
 
         def handle_outputs_toggle(show_outputs):
             return gr.update(visible=show_outputs)
@@ -944,119 +1082,64 @@ def create_app():
             )
 
         # Bind events
-        interface.load(
-            init_interface,
-            outputs=[
-                error_log,
-                summary,
-                context_for_solution,
-                step_by_step,
-                feedback_text,
-                golden_solution_text,
-                expected_behavior_text,
-                nav_info,
-                step_by_step_raw,
-                need_more_context_toggle,
-                need_more_context_reason,
-                db_need_more_context_display,
-            ],
-        )
+        entry_outputs = [
+            error_log,
+            summary,
+            context_for_solution,
+            step_by_step,
+            feedback_text,
+            golden_solution_text,
+            expected_behavior_text,
+            nav_info,
+            step_by_step_raw,
+            need_more_context_toggle,
+            need_more_context_reason,
+            db_need_more_context_display,
+        ]
+        content_toggles = [
+            show_summary_toggle,
+            show_context_toggle,
+            show_solution_toggle,
+        ]
+        navigation_outputs = [
+            error_log,
+            summary_title,
+            summary,
+            context_title,
+            context_for_solution,
+            solution_title,
+            step_by_step,
+            feedback_text,
+            golden_solution_text,
+            expected_behavior_text,
+            nav_info,
+            show_outputs_toggle,
+            *content_toggles,
+            outputs_section,
+            step_by_step_raw,
+            db_need_more_context_display,
+            need_more_context_toggle,
+            need_more_context_reason,
+        ]
+
+        interface.load(init_interface, outputs=entry_outputs)
 
         prev_btn.click(
-            handle_navigate_prev,
-            inputs=[
-                show_outputs_toggle,
-                show_summary_toggle,
-                show_context_toggle,
-                show_solution_toggle,
-            ],
-            outputs=[
-                error_log,
-                summary_title,
-                summary,
-                context_title,
-                context_for_solution,
-                solution_title,
-                step_by_step,
-                feedback_text,
-                golden_solution_text,
-                expected_behavior_text,
-                nav_info,
-                show_outputs_toggle,
-                show_summary_toggle,
-                show_context_toggle,
-                show_solution_toggle,
-                outputs_section,
-                step_by_step_raw,
-                db_need_more_context_display,
-                need_more_context_toggle,
-                need_more_context_reason,
-            ],
+            functools.partial(handle_navigate, -1),
+            inputs=content_toggles,
+            outputs=navigation_outputs,
         )
 
         next_btn.click(
-            handle_navigate_next,
-            inputs=[
-                show_outputs_toggle,
-                show_summary_toggle,
-                show_context_toggle,
-                show_solution_toggle,
-            ],
-            outputs=[
-                error_log,
-                summary_title,
-                summary,
-                context_title,
-                context_for_solution,
-                solution_title,
-                step_by_step,
-                feedback_text,
-                golden_solution_text,
-                expected_behavior_text,
-                nav_info,
-                show_outputs_toggle,
-                show_summary_toggle,
-                show_context_toggle,
-                show_solution_toggle,
-                outputs_section,
-                step_by_step_raw,
-                db_need_more_context_display,
-                need_more_context_toggle,
-                need_more_context_reason,
-            ],
+            functools.partial(handle_navigate, 1),
+            inputs=content_toggles,
+            outputs=navigation_outputs,
         )
 
         jump_btn.click(
             handle_jump,
-            inputs=[
-                jump_input,
-                show_outputs_toggle,
-                show_summary_toggle,
-                show_context_toggle,
-                show_solution_toggle,
-            ],
-            outputs=[
-                error_log,
-                summary_title,
-                summary,
-                context_title,
-                context_for_solution,
-                solution_title,
-                step_by_step,
-                feedback_text,
-                golden_solution_text,
-                expected_behavior_text,
-                nav_info,
-                show_outputs_toggle,
-                show_summary_toggle,
-                show_context_toggle,
-                show_solution_toggle,
-                outputs_section,
-                step_by_step_raw,
-                db_need_more_context_display,
-                need_more_context_toggle,
-                need_more_context_reason,
-            ],
+            inputs=[jump_input, *content_toggles],
+            outputs=navigation_outputs,
         )
 
         save_feedback_btn.click(
@@ -1074,20 +1157,7 @@ def create_app():
         cluster_sample_toggle.change(
             handle_cluster_toggle,
             inputs=[cluster_sample_toggle],
-            outputs=[
-                error_log,
-                summary,
-                context_for_solution,
-                step_by_step,
-                feedback_text,
-                golden_solution_text,
-                expected_behavior_text,
-                nav_info,
-                step_by_step_raw,
-                need_more_context_toggle,
-                need_more_context_reason,
-                db_need_more_context_display,
-            ],
+            outputs=entry_outputs,
         )
 
         show_outputs_toggle.change(
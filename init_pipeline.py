@@ -2,8 +2,8 @@ import asyncio
 from alm.pipeline.offline import whole_pipeline
 from alm.utils.phoenix import register_phoenix
 import os
-import glob
 import shutil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
 
@@ -45,13 +45,21 @@ def setup_data_directories():
             image_pdfs = list(image_kb_dir.glob("*.pdf"))
             if image_pdfs:
                 print(f"\nCopying {len(image_pdfs)} PDF file(s) from image to PVC...")
-                for pdf_path in image_pdfs:
-                    dest_path = pvc_kb_dir / pdf_path.name
-                    try:
-                        shutil.copy2(pdf_path, dest_path)
-                        print(f"  ✓ Copied {pdf_path.name}")
-                    except Exception as e:
-                        print(f"  ✗ Error copying {pdf_path.name}: {e}")
+                # Copy the files concurrently; copy2 already does an in-kernel
+                # copy (sendfile) on Linux, so each copy is I/O wait
+                with ThreadPoolExecutor(max_workers=len(image_pdfs)) as executor:
+                    futures = [
+                        executor.submit(
+                            shutil.copy2, pdf_path, pvc_kb_dir / pdf_path.name
+                        )
+                        for pdf_path in image_pdfs
+                    ]
+                    for pdf_path, future in zip(image_pdfs, futures):
+                        try:
+                            future.result()
+                            print(f"  ✓ Copied {pdf_path.name}")
+                        except Exception as e:
+                            print(f"  ✗ Error copying {pdf_path.name}: {e}")
                 print("✓ Knowledge base PDFs copied to PVC")
             else:
                 print(f"\n⚠ No PDFs found in image at {image_kb_dir}")
@@ -71,8 +79,6 @@ def build_rag_index():
     This runs during the init job to create the FAISS index and metadata.
     """
     from src.alm.config import config
-    from src.alm.rag.ingest_and_chunk import AnsibleErrorParser
-    from src.alm.rag.embed_and_index import AnsibleErrorEmbedder
 
     # Check if RAG is enabled
     rag_enabled = os.getenv("RAG_ENABLED", "true").lower() == "true"
@@ -96,6 +102,11 @@ def build_rag_index():
     print("=" * 70)
 
     try:
+        # Imported only when the index is built, as these pull in
+        # sentence-transformers, faiss and pypdf
+        from src.alm.rag.ingest_and_chunk import AnsibleErrorParser
+        from src.alm.rag.embed_and_index import AnsibleErrorEmbedder
+
         # Validate configuration
         config.print_config()
         config.validate()
@@ -106,7 +117,7 @@ def build_rag_index():
 
         # Find PDFs in knowledge base
         kb_dir = config.storage.knowledge_base_dir
-        pdf_files = sorted(glob.glob(str(kb_dir / "*.pdf")))
+        pdf_files = sorted(kb_dir.glob("*.pdf"))
 
         if not pdf_files:
             print(f"⚠ WARNING: No PDF files found in {kb_dir}")
@@ -115,19 +126,26 @@ def build_rag_index():
 
         print(f"\n✓ Found {len(pdf_files)} PDF files in knowledge base:")
         for pdf in pdf_files:
-            print(f"  - {Path(pdf).name}")
+            print(f"  - {pdf.name}")
 
-        # Process all PDFs
+        # Process all PDFs, parsing them in parallel as text extraction is
+        # CPU-bound; results are collected in file order
         all_chunks = []
-        for pdf_path in pdf_files:
-            print(f"\n📄 Processing: {Path(pdf_path).name}")
-            try:
-                chunks = parser.parse_pdf_to_chunks(pdf_path)
-                all_chunks.extend(chunks)
-                print(f"  ✓ Extracted {len(chunks)} chunks")
-            except Exception as e:
-                print(f"  ✗ Error processing {Path(pdf_path).name}: {e}")
-                continue
+        max_workers = min(len(pdf_files), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(parser.parse_pdf_to_chunks, str(pdf_path))
+                for pdf_path in pdf_files
+            ]
+            for pdf_path, future in zip(pdf_files, futures):
+                print(f"\n📄 Processing: {pdf_path.name}")
+                try:
+                    chunks = future.result()
+                    all_chunks.extend(chunks)
+                    print(f"  ✓ Extracted {len(chunks)} chunks")
+                except Exception as e:
+                    print(f"  ✗ Error processing {pdf_path.name}: {e}")
+                    continue
 
         if not all_chunks:
             print("\n⚠ WARNING: No chunks extracted from PDFs")
@@ -1,4 +1,6 @@
-from fastapi import FastAPI
+import asyncio
+
+from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 import joblib
 import numpy as np
@@ -17,7 +19,88 @@ else:
 
 
 class InputData(BaseModel):
-    embeddings: list[float]  # Adjust based on your model's input shape
+    embeddings: list[list[float]]  # One embedding per log
+
+
+class ClusterBatcher:
+    """
+    Fuses the embeddings of concurrent /cluster requests into one predict call.
+
+    Requests queued while a prediction runs (or within max_queue_time of the
+    first one) are stacked into a single matrix, up to max_batch_size rows.
+    """
+
+    def __init__(self, max_batch_size: int = 64, max_queue_time: float = 5e-3):
+        self.max_batch_size = max_batch_size
+        self.max_queue_time = max_queue_time
+        self._queue = None
+        self._worker = None
+
+    async def process(self, rows: np.ndarray) -> list:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._drain())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((rows, future))
+        return await future
+
+    async def _drain(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            try:
+                size = len(batch[0][0])
+                deadline = loop.time() + self.max_queue_time
+                while size < self.max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except TimeoutError:
+                        break
+                    batch.append(item)
+                    size += len(item[0])
+                await self.process_batch(batch)
+            except Exception as e:
+                # The worker must outlive any batch, or later requests never finish
+                print(f"Error processing cluster batch: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    async def process_batch(self, batch):
+        # Only requests with the same embedding width can be stacked
+        groups = {}
+        for rows, future in batch:
+            groups.setdefault(rows.shape[1:], []).append((rows, future))
+        for group in groups.values():
+            await self._predict_group(group)
+
+    async def _predict_group(self, batch):
+        try:
+            # A lone request is predicted on its own array, without a stacking copy
+            input_array = (
+                batch[0][0]
+                if len(batch) == 1
+                else np.concatenate([rows for rows, _ in batch])
+            )
+            # Predict off the event loop so new requests keep queueing meanwhile
+            labels = await asyncio.to_thread(model.predict, input_array)
+            labels = labels.tolist()
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        start = 0
+        for rows, future in batch:
+            if not future.done():  # request was cancelled
+                future.set_result(labels[start : start + len(rows)])
+            start += len(rows)
+
+
+batcher = ClusterBatcher()
 
 
 @app.get("/health")
@@ -27,10 +110,25 @@ def health_check():
 
 
 @app.post("/cluster")
-def predict(data: InputData):
-    input_array = np.array(data.embeddings)
-    prediction = model.predict(input_array)
-    return {"labels": prediction.tolist()}
+async def predict(data: InputData):
+    try:
+        input_array = np.asarray(data.embeddings, dtype=np.float32)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid embeddings: {e}")
+    # Reject bad shapes here, before they are batched with other requests
+    if input_array.ndim != 2 or len(input_array) == 0:
+        raise HTTPException(
+            status_code=422, detail="embeddings must be a non-empty list of vectors"
+        )
+    n_features = getattr(model, "n_features_in_", None)
+    if n_features is not None and input_array.shape[1] != n_features:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Expected embeddings of width {n_features}, "
+            f"got {input_array.shape[1]}",
+        )
+    labels = await batcher.process(input_array)
+    return {"labels": labels}
 
 
 def main():
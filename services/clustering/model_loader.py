@@ -1,13 +1,21 @@
 import os
-import subprocess
 import logging
+import time
+from functools import cache, lru_cache
 from sklearn.base import BaseEstimator
 
 
 def load_from_local_file(model_path: str) -> BaseEstimator:
+    # The modification time is part of the key, so a rewritten file is reloaded
+    return _load_local_model(model_path, os.path.getmtime(model_path))
+
+
+@lru_cache(maxsize=2)
+def _load_local_model(model_path: str, mtime: float) -> BaseEstimator:
     import joblib
 
-    return joblib.load(model_path)
+    # Memory-map the arrays, so workers share the pages instead of copying them
+    return joblib.load(model_path, mmap_mode="r")
 
 
 def load_from_minio(bucket_name: str, file_name: str) -> BaseEstimator:
@@ -40,40 +48,107 @@ def load_from_minio(bucket_name: str, file_name: str) -> BaseEstimator:
 
 
 def load_from_model_registry(model_name: str) -> BaseEstimator:
-    from model_registry import ModelRegistry  # , utils
-
     author_value, user_token_value, host_value = _fetch_model_registry_credentials()
 
-    model_registry = ModelRegistry(
-        host=host_value,
-        author=author_value,
-        token=user_token_value,
-    )
+    model_registry = _model_registry_client(host_value, author_value, user_token_value)
 
     model = model_registry.get_registered_model(model_name)
     return model
 
 
+@lru_cache(maxsize=4)
+def _model_registry_client(host: str, author: str, token: str):
+    """
+    One client (and connection pool) per credentials; a refreshed token is a
+    new key, so clients holding an expired one fall out of the cache.
+    """
+    from model_registry import ModelRegistry  # , utils
+
+    return ModelRegistry(host=host, author=author, token=token)
+
+
+# How long credentials are reused, the token expires sooner than the route
+TOKEN_TTL_SECONDS = 5 * 60
+HOST_TTL_SECONDS = 60 * 60
+
+SERVICE_ACCOUNT_TOKEN_PATH = "/var/run/secrets/kubernetes.io/serviceaccount/token"
+REGISTRY_HOST_ANNOTATION = "routing.opendatahub.io/external-address-rest"
+
+_cached_values: dict[str, tuple[float, str]] = {}
+
+
+def _ttl_cached(key: str, ttl: float, compute) -> str:
+    """Return compute(), reusing a non-empty result for ttl seconds."""
+    cached = _cached_values.get(key)
+    if cached is not None and time.monotonic() - cached[0] < ttl:
+        return cached[1]
+    value = compute()
+    if value:  # don't keep a missing service around for the whole ttl
+        _cached_values[key] = (time.monotonic(), value)
+    return value
+
+
+def _in_cluster() -> bool:
+    return bool(os.getenv("KUBERNETES_SERVICE_HOST"))
+
+
+@cache
+def _load_kube_config():
+    from kubernetes import config
+
+    if _in_cluster():
+        config.load_incluster_config()
+    else:
+        config.load_kube_config()
+
+
+def _user_name() -> str:
+    from kubernetes import client
+
+    review = client.AuthenticationV1Api().create_self_subject_review(
+        client.V1SelfSubjectReview()
+    )
+    return review.status.user_info.username
+
+
+def _user_token() -> str:
+    if _in_cluster():
+        with open(SERVICE_ACCOUNT_TOKEN_PATH) as f:
+            return f.read().strip()
+    from kubernetes import client
+
+    api_key = client.Configuration.get_default_copy().api_key
+    return api_key.get("authorization", "").removeprefix("Bearer ").strip()
+
+
+def _registry_host(mr_namespace: str, mr_container: str) -> str:
+    from kubernetes import client
+    from kubernetes.client.exceptions import ApiException
+
+    try:
+        service = client.CoreV1Api().read_namespaced_service(mr_container, mr_namespace)
+    except ApiException as e:
+        if e.status == 404:
+            return ""
+        raise
+    return (service.metadata.annotations or {}).get(REGISTRY_HOST_ANNOTATION, "")
+
+
 def _fetch_model_registry_credentials() -> tuple[str, str, str]:
     logger = logging.getLogger(__name__)
+    _load_kube_config()
 
-    author_value = subprocess.run(
-        "oc whoami", shell=True, capture_output=True, text=True, check=True
-    ).stdout.strip()
-    user_token_value = subprocess.run(
-        "oc whoami -t", shell=True, capture_output=True, text=True, check=True
-    ).stdout.strip()
+    author_value = _ttl_cached("author", TOKEN_TTL_SECONDS, _user_name)
+    user_token_value = _ttl_cached("token", TOKEN_TTL_SECONDS, _user_token)
     logger.debug(f"author_value = {author_value}")
     mr_namespace = os.getenv("MODEL_REGISTRY_NAMESPACE")
     mr_container = os.getenv("MODEL_REGISTRY_CONTAINER")
 
-    cmd = (
-        f"oc get svc {mr_container} -n {mr_namespace} -o json | "
-        f"jq '.metadata.annotations.\"routing.opendatahub.io/external-address-rest\"'"
+    host_output = _ttl_cached(
+        f"host/{mr_namespace}/{mr_container}",
+        HOST_TTL_SECONDS,
+        lambda: _registry_host(mr_namespace, mr_container),
     )
-    host_output = subprocess.run(
-        cmd, shell=True, capture_output=True, text=True, check=True
-    ).stdout.strip()
 
     if not host_output:
         error_message = (
@@ -83,5 +158,5 @@ def _fetch_model_registry_credentials() -> tuple[str, str, str]:
         logger.info(error_message)
         raise RuntimeError(error_message)
 
-    host_value = f"https://{host_output[1:-5]}"  # Remove quotes and :443
+    host_value = f"https://{host_output.removesuffix(':443')}"
     return author_value, user_token_value, host_value
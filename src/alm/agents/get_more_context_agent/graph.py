@@ -28,7 +28,7 @@ async def loki_router_node(state: ContextAgentState):
         goto="loki_sub_agent"
         if loki_router_result.classification == "need_more_context_from_loki_db"
         else END,
-        update={"loki_router_result": loki_router_result.model_dump()},
+        update={"loki_router_result": loki_router_result},
     )
 
 
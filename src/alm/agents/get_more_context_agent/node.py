@@ -1,11 +1,19 @@
+import asyncio
 from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field
 from typing import Literal
 
+from alm.llm import structured_llm
+from alm.utils.prompts import load_prompt
+
 from .rag_handler import RAGHandler
 
-# Initialize RAG handler instance
+# Initialize RAG handler instance, loading the index in the background
 _rag_handler = RAGHandler()
+_rag_handler.start_warmup()
+
+# Cheat sheet lookups started ahead of time, by log summary
+_prefetched_cheat_sheet_contexts: dict[str, asyncio.Task] = {}
 
 
 class LokiRouterSchema(BaseModel):
@@ -17,8 +25,9 @@ class LokiRouterSchema(BaseModel):
     )
 
 
-with open("src/alm/agents/get_more_context_agent/prompts/loki_router.md", "r") as f:
-    loki_router_user_message = f.read()
+loki_router_user_message = load_prompt(
+    "agents/get_more_context_agent/prompts/loki_router.md"
+)
 
 
 async def get_cheat_sheet_context(log_summary: str) -> str:
@@ -31,13 +40,31 @@ async def get_cheat_sheet_context(log_summary: str) -> str:
     Returns:
         Formatted string with relevant error solutions, or empty string if unavailable
     """
+    task = _prefetched_cheat_sheet_contexts.pop(log_summary, None)
+    if task is not None:
+        return await task
     return await _rag_handler.get_cheat_sheet_context(log_summary)
 
 
+def prefetch_cheat_sheet_context(log_summary: str):
+    """Start retrieving the cheat sheet context before get_cheat_sheet_context needs it."""
+    if log_summary not in _prefetched_cheat_sheet_contexts:
+        _prefetched_cheat_sheet_contexts[log_summary] = asyncio.create_task(
+            _rag_handler.get_cheat_sheet_context(log_summary)
+        )
+
+
+def discard_cheat_sheet_context(log_summary: str):
+    """Drop a prefetched cheat sheet context that turned out not to be needed."""
+    task = _prefetched_cheat_sheet_contexts.pop(log_summary, None)
+    if task is not None:
+        task.cancel()
+
+
 async def loki_router(
     log_summary: str, cheat_sheet_context: str, llm: ChatOpenAI
 ) -> LokiRouterSchema:
-    llm_structured = llm.with_structured_output(LokiRouterSchema)
+    llm_structured = structured_llm(llm, LokiRouterSchema)
     output = await llm_structured.ainvoke(
         [
             {
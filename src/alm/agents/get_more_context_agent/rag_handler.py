@@ -1,10 +1,93 @@
+import asyncio
+import hashlib
+import io
 import os
 import logging
+import re
+import threading
+from collections import OrderedDict
 from typing import Optional
 
+from alm.utils.batching import AutoBatcher
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Result sections in output order: (field, text before it, text after it)
+_RESULT_SECTIONS = (
+    ("description", "**Description:**\n", "\n\n"),
+    ("symptoms", "**Symptoms:**\n", "\n\n"),
+    ("resolution", "**Resolution:**\n", "\n\n"),
+    ("code", "**Code Example:**\n```\n", "\n```\n\n"),
+)
+
+# Timestamps and UUIDs in a summary don't change which errors match it
+_VOLATILE_TOKENS_RE = re.compile(
+    r"\d{4}-\d{2}-\d{2}T[^ ]+|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+)
+
+
+def _env_flag(name: str, default: str = "true") -> bool:
+    return os.getenv(name, default).lower() in ["true", "1", "yes"]
+
+
+class RAGHandlerConfig:
+    """RAG retrieval settings, read from the environment once at import."""
+
+    def __init__(self):
+        self.enabled = _env_flag("RAG_ENABLED")
+        self.warmup = _env_flag("RAG_WARMUP")
+        self.top_k = int(os.getenv("RAG_TOP_K", "10"))
+        self.top_n = int(os.getenv("RAG_TOP_N", "3"))
+        self.similarity_threshold = float(os.getenv("RAG_SIMILARITY_THRESHOLD", "0.6"))
+        # Concurrent queries sharing one embedding + search call
+        self.max_batch = int(os.getenv("RAG_MAX_BATCH", "32"))
+        self.batch_window_ms = float(os.getenv("RAG_BATCH_WINDOW_MS", "5"))
+        # Formatted contexts kept for repeated summaries
+        self.cache_size = int(os.getenv("RAG_CACHE_SIZE", "512"))
+
+    def __repr__(self):
+        return (
+            f"RAGHandlerConfig(\n"
+            f"  enabled={self.enabled}\n"
+            f"  warmup={self.warmup}\n"
+            f"  top_k={self.top_k}\n"
+            f"  top_n={self.top_n}\n"
+            f"  similarity_threshold={self.similarity_threshold}\n"
+            f"  max_batch={self.max_batch}\n"
+            f"  batch_window_ms={self.batch_window_ms}\n"
+            f"  cache_size={self.cache_size}\n"
+            f")"
+        )
+
+
+rag_config = RAGHandlerConfig()
+
+
+class _BatchedQuery:
+    """Runs a batch of log summaries through query_batch in a worker thread."""
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+
+    async def abatch(self, log_summaries, return_exceptions=False):
+        try:
+            return await asyncio.to_thread(self.pipeline.query_batch, log_summaries)
+        except Exception:
+            if not return_exceptions or len(log_summaries) == 1:
+                raise
+        # Retry one by one, so a failing summary only fails its own caller
+        return await asyncio.to_thread(self._query_each, log_summaries)
+
+    def _query_each(self, log_summaries):
+        results = []
+        for log_summary in log_summaries:
+            try:
+                results.append(self.pipeline.query(log_summary))
+            except Exception as e:
+                results.append(e)
+        return results
+
 
 class RAGHandler:
     """
@@ -18,6 +101,10 @@ class RAGHandler:
     _instance: Optional["RAGHandler"] = None
     _pipeline = None
     _enabled: Optional[bool] = None
+    _batcher: Optional[AutoBatcher] = None
+    # Formatted contexts by summary key, least recently used first
+    _context_cache: "OrderedDict[bytes, str]" = OrderedDict()
+    _init_lock = threading.Lock()
 
     def __new__(cls):
         """Singleton pattern implementation."""
@@ -37,10 +124,16 @@ class RAGHandler:
         if self._enabled is not None:
             return self._pipeline
 
+        # The warmup thread and a request may both get here first
+        with self._init_lock:
+            if self._enabled is not None:
+                return self._pipeline
+            return self._load_rag_pipeline()
+
+    def _load_rag_pipeline(self):
         # Check if RAG is enabled via environment variable
-        rag_enabled_env = os.getenv("RAG_ENABLED", "true").lower()
-        if rag_enabled_env not in ["true", "1", "yes"]:
-            logger.info("RAG is disabled (RAG_ENABLED=%s)", rag_enabled_env)
+        if not rag_config.enabled:
+            logger.info("RAG is disabled (RAG_ENABLED=%s)", os.getenv("RAG_ENABLED"))
             self._enabled = False
             self._pipeline = None
             return None
@@ -50,16 +143,17 @@ class RAGHandler:
 
             from alm.rag.query_pipeline import AnsibleErrorQueryPipeline
 
-            # Get configuration from environment variables
-            top_k = int(os.getenv("RAG_TOP_K", "10"))
-            top_n = int(os.getenv("RAG_TOP_N", "3"))
-            similarity_threshold = float(os.getenv("RAG_SIMILARITY_THRESHOLD", "0.6"))
-
             # Initialize pipeline (this loads the FAISS index)
             self._pipeline = AnsibleErrorQueryPipeline(
-                top_k=top_k,
-                top_n=top_n,
-                similarity_threshold=similarity_threshold,
+                top_k=rag_config.top_k,
+                top_n=rag_config.top_n,
+                similarity_threshold=rag_config.similarity_threshold,
+            )
+            # Alerts arriving in the same tick share one embedding + search call
+            self._batcher = AutoBatcher(
+                _BatchedQuery(self._pipeline),
+                rag_config.max_batch,
+                rag_config.batch_window_ms,
             )
 
             self._enabled = True
@@ -88,6 +182,29 @@ class RAGHandler:
             self._pipeline = None
             return None
 
+    def warmup(self):
+        """
+        Load the FAISS index and run one query, so the first request doesn't
+        pay for loading the index and the embedder's first forward pass.
+        """
+        pipeline = self._initialize_rag_pipeline()
+        if pipeline is None:
+            # The index may not be built yet, let the first request try again
+            with self._init_lock:
+                self._enabled = None
+            return
+        try:
+            pipeline.query("ansible task failed")
+            logger.info("✓ RAG pipeline warmed up")
+        except Exception as e:
+            logger.warning("RAG warmup query failed: %s", e)
+
+    def start_warmup(self):
+        """Warm up the RAG pipeline in a background thread (unless RAG_WARMUP=false)."""
+        if not (rag_config.enabled and rag_config.warmup):
+            return
+        threading.Thread(target=self.warmup, name="rag-warmup", daemon=True).start()
+
     def _format_rag_results(self, response) -> str:
         """
         Format RAG query results into a structured string for LLM context.
@@ -101,35 +218,36 @@ class RAGHandler:
         if not response.results:
             return "No matching solutions found in knowledge base."
 
-        output = ["## Relevant Error Solutions from Knowledge Base\n"]
+        buffer = io.StringIO()
+        buffer.write("## Relevant Error Solutions from Knowledge Base\n\n")
 
         for i, result in enumerate(response.results, 1):
-            output.append(f"### Error {i}: {result.error_title}")
-            output.append(f"**Confidence Score:** {result.similarity_score:.2f}\n")
-
-            if result.sections.description:
-                output.append("**Description:**")
-                output.append(result.sections.description)
-                output.append("")
-
-            if result.sections.symptoms:
-                output.append("**Symptoms:**")
-                output.append(result.sections.symptoms)
-                output.append("")
-
-            if result.sections.resolution:
-                output.append("**Resolution:**")
-                output.append(result.sections.resolution)
-                output.append("")
-
-            if result.sections.code:
-                output.append("**Code Example:**")
-                output.append(f"```\n{result.sections.code}\n```")
-                output.append("")
-
-            output.append("---\n")
-
-        return "\n".join(output)
+            if i > 1:
+                buffer.write("\n")
+            buffer.write(
+                f"### Error {i}: {result.error_title}\n"
+                f"**Confidence Score:** {result.similarity_score:.2f}\n\n"
+            )
+            for field, prefix, suffix in _RESULT_SECTIONS:
+                body = getattr(result.sections, field)
+                if body:
+                    buffer.write(prefix)
+                    buffer.write(body)
+                    buffer.write(suffix)
+            buffer.write("---\n")
+
+        return buffer.getvalue()
+
+    @staticmethod
+    def _context_key(log_summary: str) -> bytes:
+        normalized = _VOLATILE_TOKENS_RE.sub("", log_summary)
+        return hashlib.blake2b(normalized.encode(), digest_size=16).digest()
+
+    def _remember_context(self, key: bytes, context: str):
+        self._context_cache[key] = context
+        self._context_cache.move_to_end(key)
+        if len(self._context_cache) > rag_config.cache_size:
+            self._context_cache.popitem(last=False)
 
     async def get_cheat_sheet_context(self, log_summary: str) -> str:
         """
@@ -149,8 +267,15 @@ class RAGHandler:
         """
         logger.info("Retrieving cheat sheet context for log summary")
 
-        # Initialize RAG pipeline (lazy loading)
-        pipeline = self._initialize_rag_pipeline()
+        # Repeated failures produce near-identical summaries
+        key = self._context_key(log_summary)
+        if key in self._context_cache:
+            self._context_cache.move_to_end(key)
+            logger.debug("Cheat sheet context served from cache")
+            return self._context_cache[key]
+
+        # Initialize RAG pipeline (lazy loading), off the event loop like the query
+        pipeline = await asyncio.to_thread(self._initialize_rag_pipeline)
 
         if pipeline is None:
             logger.debug("RAG pipeline not available, returning empty context")
@@ -161,7 +286,8 @@ class RAGHandler:
             logger.debug(
                 "Querying RAG system with log summary: %s...", log_summary[:100]
             )
-            response = pipeline.query(log_summary)
+            # Batched with concurrent queries and run in a worker thread
+            response = await self._batcher.ainvoke(log_summary)
 
             # Format results
             formatted_context = self._format_rag_results(response)
@@ -172,6 +298,7 @@ class RAGHandler:
                 response.metadata["search_time_ms"],
             )
 
+            self._remember_context(key, formatted_context)
             return formatted_context
 
         except Exception as e:
@@ -1,5 +1,5 @@
 from alm.agents.get_more_context_agent.state import ContextAgentState
-from alm.agents.loki_agent.schemas import LogEntry, LogLabels
+from alm.agents.loki_agent.schemas import LogEntry
 from alm.llm import get_llm
 from alm.models import GrafanaAlert
 from alm.agents.node import (
@@ -12,6 +12,10 @@ from alm.agents.node import (
 from langgraph.graph import StateGraph, START, END
 from langgraph.types import Command
 from alm.agents.get_more_context_agent.graph import more_context_agent_graph
+from alm.agents.get_more_context_agent.node import (
+    prefetch_cheat_sheet_context,
+    discard_cheat_sheet_context,
+)
 
 from typing import Literal
 
@@ -30,20 +34,22 @@ async def cluster_logs_node(
 
 async def summarize_log_node(
     state: GrafanaAlert,
-) -> Command[Literal["classify_log_node"]]:
+) -> Command[Literal["classify_log_node", "router_step_by_step_solution_node"]]:
     log_summary = await summarize_log(state.logMessage, llm)
-    return Command(goto="classify_log_node", update={"logSummary": log_summary})
+    # Classification and routing only need the summary, so they run in parallel;
+    # the router's next node starts once both have finished
+    return Command(
+        goto=["classify_log_node", "router_step_by_step_solution_node"],
+        update={"logSummary": log_summary},
+    )
 
 
 async def classify_log_node(
     state: GrafanaAlert,
-) -> Command[Literal["router_step_by_step_solution_node"]]:
+) -> Command:
     log_summary = state.logSummary
     log_category = await classify_log(log_summary, llm)
-    return Command(
-        goto="router_step_by_step_solution_node",
-        update={"expertClassification": log_category},
-    )
+    return Command(update={"expertClassification": log_category})
 
 
 async def suggest_step_by_step_solution_node(
@@ -67,7 +73,16 @@ async def router_step_by_step_solution_node(
     ]
 ]:
     log_summary = state.logSummary
-    classification = await router_step_by_step_solution(log_summary, llm)
+    # The cheat sheet lookup only needs the summary, so it starts while the
+    # router decides whether get_more_context_node will use it
+    prefetch_cheat_sheet_context(log_summary)
+    try:
+        classification = await router_step_by_step_solution(log_summary, llm)
+    except BaseException:
+        discard_cheat_sheet_context(log_summary)
+        raise
+    if classification == "No More Context Needed":
+        discard_cheat_sheet_context(log_summary)
     return Command(
         goto="suggest_step_by_step_solution_node"
         if classification == "No More Context Needed"
@@ -80,10 +95,10 @@ async def get_more_context_node(
     state: GrafanaAlert,
 ) -> Command[Literal[END]]:
     log_summary = state.logSummary
-    log_labels = LogLabels.model_validate(state.log_labels)
+    # LogEntry validates the stored labels dict into LogLabels itself
     log_entry = LogEntry(
         message=state.logMessage,
-        log_labels=log_labels,
+        log_labels=state.log_labels,
         timestamp="Unknown timestamp"
         if state.logTimestamp is None
         else state.logTimestamp.isoformat(),
@@ -95,10 +110,11 @@ async def get_more_context_node(
             expert_classification=state.expertClassification,
         )
     )
-    context_agent_state = ContextAgentState.model_validate(subgraph_state)
-    loki_context = context_agent_state.loki_context
+    # Only two string fields are needed, so read them from the returned state
+    # dict instead of validating it back into a ContextAgentState
+    loki_context = subgraph_state.get("loki_context")
     cheat_sheet_context = (
-        f"Context from cheat sheet:\n{context_agent_state.cheat_sheet_context}"
+        f"Context from cheat sheet:\n{subgraph_state.get('cheat_sheet_context')}"
     )
     context = (
         f"Context logs from loki:\n{loki_context}\n\n{cheat_sheet_context}"
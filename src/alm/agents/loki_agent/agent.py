@@ -3,6 +3,10 @@ LangChain ToolCallingAgent integration with LangGraph for perfect log query func
 """
 
 import json
+import logging
+import os
+import re
+import threading
 from typing import Dict, Any, Optional
 
 from langchain.agents import create_agent
@@ -10,8 +14,43 @@ from langchain_core.messages import ToolMessage
 
 from alm.agents.loki_agent.schemas import LogToolOutput, LokiAgentOutput, ToolStatus
 from alm.llm import get_llm
+from alm.models import GrafanaAlert
+from alm.utils.prompts import load_prompt
 from alm.tools import LOKI_TOOLS
 
+logger = logging.getLogger(__name__)
+
+# create_agent's debug mode pretty-prints every agent step
+LOKI_AGENT_DEBUG = os.getenv("LOKI_AGENT_DEBUG", "false").lower() in ["true", "1"]
+
+# Longest log message passed to the agent as context
+LOG_MESSAGE_MAX_CHARS = 500
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars] + "..."
+
+
+# Word boundaries inside a camelCase name (before each inner capital)
+_CAMEL_CASE_RE = re.compile(r"(?<!^)(?=[A-Z])")
+
+
+def _format_field_name(key: str) -> str:
+    """Convert camelCase to Title Case with spaces."""
+    return _CAMEL_CASE_RE.sub(" ", key).title()
+
+
+# Context keys are alert fields, so their labels are computed once
+_FIELD_LABELS = {name: _format_field_name(name) for name in GrafanaAlert.model_fields}
+
+
+def _field_label(key: str) -> str:
+    if key in _FIELD_LABELS:
+        return _FIELD_LABELS[key]
+    return _format_field_name(key)
+
 
 class LokiQueryAgent:
     """
@@ -26,16 +65,15 @@ class LokiQueryAgent:
     def _initialize_agent(self):
         """Initialize the LangChain Agent using create_agent()"""
         # Load system prompt from file
-        with open(
-            "src/alm/agents/loki_agent/prompts/loki_agent_system_prompt.md", "r"
-        ) as f:
-            system_prompt = f.read()
+        system_prompt = load_prompt(
+            "agents/loki_agent/prompts/loki_agent_system_prompt.md"
+        )
 
         # Create the agent with system prompt
         return create_agent(
             model=self.llm,
             tools=self.tools,
-            debug=True,
+            debug=LOKI_AGENT_DEBUG,
             system_prompt=system_prompt,
         )
 
@@ -63,40 +101,32 @@ class LokiQueryAgent:
                 context_parts = []
 
                 # Add logMessage first with clear label to avoid confusion with summary
-                if "logMessage" in context and context["logMessage"]:
-                    value_str = str(context["logMessage"])
-                    if len(value_str) > 500:
-                        value_str = value_str[:500] + "..."
-                    context_parts.append(f"Log Message: {value_str}")
+                log_message = context.get("logMessage")
+                if log_message:
+                    context_parts.append(
+                        f"Log Message: {_truncate(str(log_message), LOG_MESSAGE_MAX_CHARS)}"
+                    )
 
                 # Add all other fields generically
                 for key, value in context.items():
                     if (
                         key != "logMessage" and value
                     ):  # Skip logMessage (already added) and empty values
-                        # Convert camelCase to Title Case with spaces
-                        formatted_key = (
-                            "".join([" " + c if c.isupper() else c for c in key])
-                            .strip()
-                            .title()
-                        )
-
-                        context_parts.append(f"{formatted_key}: {str(value)}")
+                        context_parts.append(f"{_field_label(key)}: {value}")
 
                 if context_parts:
-                    enhanced_request = (
-                        f"{user_request}\n\nAdditional Context:\n"
-                        + "\n".join(context_parts)
+                    enhanced_request = "\n".join(
+                        (f"{user_request}\n\nAdditional Context:", *context_parts)
                     )
 
-            print(f"\n\n📊 Enhanced Request:\n{enhanced_request}\n\n")
+            logger.debug("Enhanced request:\n%s", enhanced_request)
 
             # Execute the agent
             result = await self.agent.ainvoke(
                 {"messages": [{"role": "user", "content": enhanced_request}]}
             )
 
-            print(f"\n\n📊 Result: {result}\n\n")
+            logger.debug("Loki agent result: %s", result)
 
             # Extract tool results from ToolMessages
             messages = result.get("messages", [])
@@ -113,7 +143,7 @@ class LokiQueryAgent:
                         tool_result
                     )
 
-                    print(f"\n\n📊 LogToolOutput object:\n{log_tool_output_object}\n\n")
+                    logger.debug("LogToolOutput object:\n%s", log_tool_output_object)
 
                     return LokiAgentOutput(
                         status=ToolStatus.SUCCESS,
@@ -123,7 +153,7 @@ class LokiQueryAgent:
                         tool_messages=tool_messages,
                     )
                 except json.JSONDecodeError as e:
-                    print(f"JSON decode error in query_logs: {e}")
+                    logger.warning("JSON decode error in query_logs: %s", e)
                     # If not JSON, return as text
                     return LokiAgentOutput(
                         status=ToolStatus.SUCCESS,
@@ -153,10 +183,7 @@ class LokiQueryAgent:
                 )
 
         except Exception as e:
-            print(f"Exception in query_logs: {e}")
-            import traceback
-
-            traceback.print_exc()
+            logger.exception("Exception in query_logs: %s", e)
 
             return LokiAgentOutput(
                 status=ToolStatus.ERROR,
@@ -174,11 +201,15 @@ class LokiQueryAgent:
 
 # Global agent instance
 _loki_agent = None
+_loki_agent_lock = threading.Lock()
 
 
 def get_loki_agent() -> LokiQueryAgent:
     """Get or create the global LokiQueryAgent instance"""
     global _loki_agent
     if _loki_agent is None:
-        _loki_agent = LokiQueryAgent()
+        # Preloading and worker threads may both get here first
+        with _loki_agent_lock:
+            if _loki_agent is None:
+                _loki_agent = LokiQueryAgent()
     return _loki_agent
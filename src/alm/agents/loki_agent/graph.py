@@ -5,6 +5,7 @@ This subgraph handles retrieval of additional log context from Loki:
 - START → identify_missing_log_data_node → loki_execute_query_node → END
 """
 
+import os
 from typing import Literal
 from langgraph.graph import StateGraph, START, END
 from langgraph.types import Command
@@ -15,6 +16,12 @@ from alm.agents.loki_agent.agent import get_loki_agent
 from alm.agents.loki_agent.schemas import LogToolOutput, LokiAgentOutput, ToolStatus
 from alm.llm import get_llm
 
+llm = get_llm()
+
+# Build the agent at startup instead of on the first alert needing Loki logs
+if os.getenv("LOKI_PRELOAD", "true").lower() in ["true", "1", "yes"]:
+    get_loki_agent()
+
 
 async def identify_missing_log_data_node(
     state: LokiAgentState,
@@ -28,9 +35,6 @@ async def identify_missing_log_data_node(
     log_summary = state.log_summary
     log_labels = state.log_entry.log_labels
 
-    # Get LLM instance
-    llm = get_llm()
-
     # Use LLM to identify what data is missing and generate a smart request
     user_request = await identify_missing_data(
         log_summary=log_summary, log_labels=log_labels, llm=llm
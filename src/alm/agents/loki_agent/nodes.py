@@ -6,6 +6,14 @@ from typing import Dict, Any
 from langchain_openai import ChatOpenAI
 
 from alm.agents.loki_agent.schemas import IdentifyMissingDataSchema, LogLabels
+from alm.llm import structured_llm
+from alm.utils.prompts import compile_prompt, load_prompt
+
+identify_missing_data_prompt = compile_prompt(
+    load_prompt("agents/loki_agent/prompts/identify_missing_data.md"),
+    "log_summary",
+    "log_labels",
+)
 
 
 async def identify_missing_data(
@@ -22,9 +30,6 @@ async def identify_missing_data(
     Returns:
         str: Natural language description of missing data needed for investigation
     """
-    with open("src/alm/agents/loki_agent/prompts/identify_missing_data.md", "r") as f:
-        generate_loki_query_request_user_message = f.read()
-
     # Convert log_labels to LogLabels object if it's a dict to exclude none values
     if isinstance(log_labels, dict):
         log_labels_obj = LogLabels.model_validate(log_labels)
@@ -32,7 +37,7 @@ async def identify_missing_data(
         log_labels_obj = log_labels
     log_labels_json = log_labels_obj.model_dump_json(indent=2, exclude_none=True)
 
-    llm_identify_missing_data = llm.with_structured_output(IdentifyMissingDataSchema)
+    llm_identify_missing_data = structured_llm(llm, IdentifyMissingDataSchema)
     missing_data_result = await llm_identify_missing_data.ainvoke(
         [
             {
@@ -41,11 +46,8 @@ async def identify_missing_data(
             },
             {
                 "role": "user",
-                "content": generate_loki_query_request_user_message.replace(
-                    "{log_summary}", log_summary
-                ).replace(
-                    "{log_labels}",
-                    log_labels_json,
+                "content": identify_missing_data_prompt.format_map(
+                    {"log_summary": log_summary, "log_labels": log_labels_json}
                 ),
             },
         ]
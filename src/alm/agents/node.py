@@ -1,68 +1,217 @@
+import asyncio
+from functools import lru_cache
+from itertools import batched
 from typing import List, Optional
 import os
-from sentence_transformers import SentenceTransformer
-from sklearn.cluster import DBSCAN, MeanShift, AgglomerativeClustering
-from sklearn.metrics.pairwise import cosine_distances
+from sklearn.cluster import (
+    DBSCAN,
+    MeanShift,
+    AgglomerativeClustering,
+    estimate_bandwidth,
+)
 import joblib
 from langchain_openai import ChatOpenAI
+from alm.llm import structured_llm
 from alm.agents.output_scheme import (
     SummarySchema,
     ClassifySchema,
+    SummaryBatchSchema,
+    ClassifyBatchSchema,
     SuggestStepByStepSolutionSchema,
     RouterStepByStepSolutionSchema,
 )
+import faiss
 import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+from sklearn.base import clone
+from alm.utils.embedding_cache import get_cached_encoder
 from alm.utils.minio import upload_model_to_minio
+from alm.utils.prompts import compile_prompt, load_prompt
+from alm.utils.response_cache import response_cached
 import requests
 
 # Load the user message (prompt) from the markdown file
-with open("src/alm/agents/prompts/summarize_error_log.md", "r") as f:
-    log_summary_user_message = f.read()
+log_summary_user_message = load_prompt("agents/prompts/summarize_error_log.md")
+log_category_user_message = load_prompt("agents/prompts/classifiy_log.md")
+log_suggest_step_by_step_solution_user_message = load_prompt(
+    "agents/prompts/create_step_by_step_sol.md"
+)
+router_step_by_step_solution_user_message = load_prompt(
+    "agents/prompts/router_step_by_step_solution.md"
+)
+
+# Prompts split at their placeholder once, so each call only joins the parts
+log_summary_prompt_parts = log_summary_user_message.split("{error_log}")
+log_category_prompt_parts = log_category_user_message.split("{log_summary}")
+router_step_by_step_solution_prompt_parts = (
+    router_step_by_step_solution_user_message.split("{log_summary}")
+)
+
+# The step by step solution prompt, with and without an additional context section
+log_suggest_step_by_step_solution_prompt = compile_prompt(
+    log_suggest_step_by_step_solution_user_message,
+    "log_summary",
+    "ansible_error_log",
+)
+log_suggest_step_by_step_solution_with_context_prompt = compile_prompt(
+    log_suggest_step_by_step_solution_user_message.replace(
+        "**Root Cause Analysis:**",
+        "**Additional Context:**\n```\n{context}\n```\n\n**Root Cause Analysis:**",
+    ),
+    "log_summary",
+    "ansible_error_log",
+    "context",
+)
 
-with open("src/alm/agents/prompts/classifiy_log.md", "r") as f:
-    log_category_user_message = f.read()
 
-with open("src/alm/agents/prompts/create_step_by_step_sol.md", "r") as f:
-    log_suggest_step_by_step_solution_user_message = f.read()
+async def gather_bounded(coros, limit: int):
+    """asyncio.gather, but with at most limit of the coroutines running at once."""
+    semaphore = asyncio.Semaphore(limit)
 
-with open("src/alm/agents/prompts/router_step_by_step_solution.md", "r") as f:
-    router_step_by_step_solution_user_message = f.read()
+    async def _run(coro):
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*[_run(coro) for coro in coros])
 
 
 # Can be improve by using eval-optimizer.
+@response_cached(namespace="summary")
 async def summarize_log(log, llm: ChatOpenAI):
-    llm_summary = llm.with_structured_output(SummarySchema)
+    llm_summary = structured_llm(llm, SummarySchema)
     log_summary = await llm_summary.ainvoke(
         [
             {"role": "system", "content": "You Ansible expert and helpful assistant"},
             {
                 "role": "user",
-                "content": log_summary_user_message.replace("{error_log}", log),
+                "content": log.join(log_summary_prompt_parts),
             },
         ]
     )
     return log_summary.summary
 
 
+@response_cached(namespace="category")
 async def classify_log(log_summary, llm: ChatOpenAI):
-    llm_categorize = llm.with_structured_output(ClassifySchema)
+    llm_categorize = structured_llm(llm, ClassifySchema)
     log_category = await llm_categorize.ainvoke(
         [
             {"role": "system", "content": "You Ansible expert and helpful assistant"},
             {
                 "role": "user",
-                "content": log_category_user_message.replace(
-                    "{log_summary}", log_summary
-                ),
+                "content": log_summary.join(log_category_prompt_parts),
             },
         ]
     )
     return log_category.category
 
 
+def _batch_user_message(user_message: str, placeholder: str, items: List[str]):
+    numbered_items = "\n".join(
+        f"--- entry {i} ---\n{item}" for i, item in enumerate(items, start=1)
+    )
+    # Only fill the last placeholder, earlier ones describe the input format
+    head, _, tail = user_message.rpartition(placeholder)
+    return (
+        head
+        + numbered_items
+        + tail
+        + f"\n\nThe input contains {len(items)} numbered entries. Handle each entry "
+        f"independently and return exactly {len(items)} results, in the same order "
+        "as the entries."
+    )
+
+
+async def _summarize_logs_chunk(logs: List[str], llm: ChatOpenAI):
+    llm_summary = structured_llm(llm, SummaryBatchSchema)
+    log_summaries = await llm_summary.ainvoke(
+        [
+            {"role": "system", "content": "You Ansible expert and helpful assistant"},
+            {
+                "role": "user",
+                "content": _batch_user_message(
+                    log_summary_user_message, "{error_log}", logs
+                ),
+            },
+        ]
+    )
+    if len(log_summaries.summaries) != len(logs):
+        # The model didn't return one result per log, summarize them one by one
+        return await asyncio.gather(*[summarize_log(log, llm) for log in logs])
+    return [log_summary.summary for log_summary in log_summaries.summaries]
+
+
+async def summarize_logs_batch(
+    logs: List[str],
+    llm: ChatOpenAI,
+    batch_size: int = 16,
+    max_concurrency: int = 8,
+):
+    """
+    Summarize logs with one LLM request per batch_size logs instead of one per log,
+    with at most max_concurrency requests in flight.
+
+    Returns:
+        List of summaries (same order as input)
+    """
+    chunks = await gather_bounded(
+        (
+            _summarize_logs_chunk(list(chunk), llm)
+            for chunk in batched(logs, batch_size)
+        ),
+        max_concurrency,
+    )
+    return [log_summary for chunk in chunks for log_summary in chunk]
+
+
+async def _classify_logs_chunk(log_summaries: List[str], llm: ChatOpenAI):
+    llm_categorize = structured_llm(llm, ClassifyBatchSchema)
+    log_categories = await llm_categorize.ainvoke(
+        [
+            {"role": "system", "content": "You Ansible expert and helpful assistant"},
+            {
+                "role": "user",
+                "content": _batch_user_message(
+                    log_category_user_message, "{log_summary}", log_summaries
+                ),
+            },
+        ]
+    )
+    if len(log_categories.categories) != len(log_summaries):
+        # The model didn't return one result per summary, classify them one by one
+        return await asyncio.gather(
+            *[classify_log(log_summary, llm) for log_summary in log_summaries]
+        )
+    return [log_category.category for log_category in log_categories.categories]
+
+
+async def classify_logs_batch(
+    log_summaries: List[str],
+    llm: ChatOpenAI,
+    batch_size: int = 16,
+    max_concurrency: int = 8,
+):
+    """
+    Classify log summaries with one LLM request per batch_size summaries,
+    with at most max_concurrency requests in flight.
+
+    Returns:
+        List of categories (same order as input)
+    """
+    chunks = await gather_bounded(
+        (
+            _classify_logs_chunk(list(chunk), llm)
+            for chunk in batched(log_summaries, batch_size)
+        ),
+        max_concurrency,
+    )
+    return [log_category for chunk in chunks for log_category in chunk]
+
+
 async def router_step_by_step_solution(log_summary: str, llm: ChatOpenAI):
-    llm_router_step_by_step_solution = llm.with_structured_output(
-        RouterStepByStepSolutionSchema
+    llm_router_step_by_step_solution = structured_llm(
+        llm, RouterStepByStepSolutionSchema
     )
     router_step_by_step_solution = await llm_router_step_by_step_solution.ainvoke(
         [
@@ -72,9 +221,7 @@ async def router_step_by_step_solution(log_summary: str, llm: ChatOpenAI):
             },
             {
                 "role": "user",
-                "content": router_step_by_step_solution_user_message.replace(
-                    "{log_summary}", log_summary
-                ),
+                "content": log_summary.join(router_step_by_step_solution_prompt_parts),
             },
         ]
     )
@@ -87,15 +234,13 @@ async def suggest_step_by_step_solution(
     llm: ChatOpenAI,
     context_for_step_by_step_solution: Optional[str] = None,
 ):
-    llm_suggest_step_by_step_solution = llm.with_structured_output(
-        SuggestStepByStepSolutionSchema
+    llm_suggest_step_by_step_solution = structured_llm(
+        llm, SuggestStepByStepSolutionSchema
     )
-    user_msg = log_suggest_step_by_step_solution_user_message
     if context_for_step_by_step_solution:
-        user_msg = user_msg.replace(
-            "**Root Cause Analysis:**",
-            f"**Additional Context:**\n```\n{context_for_step_by_step_solution}\n```\n\n**Root Cause Analysis:**",
-        )
+        user_msg = log_suggest_step_by_step_solution_with_context_prompt
+    else:
+        user_msg = log_suggest_step_by_step_solution_prompt
 
     log_suggest_step_by_step_solution = await llm_suggest_step_by_step_solution.ainvoke(
         [
@@ -105,43 +250,105 @@ async def suggest_step_by_step_solution(
             },
             {
                 "role": "user",
-                "content": user_msg.replace(
-                    "{log_summary}",
-                    log_summary,  # currently disabled
-                ).replace("{ansible_error_log}", log),
+                "content": user_msg.format_map(
+                    {
+                        "log_summary": log_summary,  # currently disabled
+                        "ansible_error_log": log,
+                        "context": context_for_step_by_step_solution,
+                    }
+                ),
             },
         ]
     )
     return log_suggest_step_by_step_solution.step_by_step_solution
 
 
-def _embed_logs(logs: List[str]):
+def _embed_logs(logs: List[str], log_cache_hits: bool = False):
     model_name = os.getenv("SENTENCE_TRANSFORMER_MODEL_NAME")
-    encoder = SentenceTransformer(model_name)
+    encoder = get_cached_encoder(model_name)
 
+    # Only log suffixes that weren't embedded before are encoded
     embeddings = encoder.encode(
-        [summary[-50:] for summary in logs],
-        convert_to_numpy=True,
-        show_progress_bar=True,
-        # batch_size=10,
+        [summary[-50:] for summary in logs], log_cache_hits=log_cache_hits
     )
     print("finished embeddings")
 
     return embeddings
 
 
+# Number of logs the MeanShift bandwidth is estimated from
+MEANSHIFT_BANDWIDTH_SAMPLES = 500
+
+
+def _cosine_radius_graph(embeddings: np.ndarray, max_distance: float) -> csr_matrix:
+    """
+    Sparse matrix of the cosine distances between embeddings that are within
+    max_distance of each other, found with a FAISS inner product range search
+    instead of materializing the dense N x N distance matrix.
+    """
+    vectors = np.array(embeddings, dtype=np.float32, order="C")
+    faiss.normalize_L2(vectors)
+    index = faiss.IndexFlatIP(vectors.shape[1])
+    index.add(vectors)
+    # Search slightly past the radius; DBSCAN applies the exact eps itself
+    lims, similarities, neighbors = index.range_search(
+        vectors, 1.0 - max_distance - 1e-6
+    )
+    distances = np.maximum(1.0 - similarities, 0.0)
+    return csr_matrix((distances, neighbors, lims), shape=(len(vectors), len(vectors)))
+
+
+def _agglomerative_by_component(
+    embeddings: np.ndarray, cluster_model: AgglomerativeClustering
+) -> np.ndarray:
+    """
+    Run the (non-ward) agglomerative clustering on each connected component of
+    the distance_threshold radius graph separately.
+
+    Two clusters are only merged when their linkage distance is below the
+    threshold, which needs at least one pair across them within it, so no merge
+    crosses components. The clusters match a single run over all embeddings,
+    without its N x N distance matrix.
+    """
+    radius_graph = _cosine_radius_graph(embeddings, cluster_model.distance_threshold)
+    n_components, components = connected_components(radius_graph, directed=False)
+
+    order = np.argsort(components, kind="stable")
+    members_per_component = np.split(
+        order, np.cumsum(np.bincount(components, minlength=n_components))[:-1]
+    )
+    cluster_labels = np.empty(len(embeddings), dtype=np.int64)
+    next_label = 0
+    for members in members_per_component:
+        if len(members) == 1:
+            cluster_labels[members] = next_label
+            next_label += 1
+            continue
+        labels = clone(cluster_model).fit_predict(embeddings[members])
+        cluster_labels[members] = labels + next_label
+        next_label += labels.max() + 1
+    return cluster_labels
+
+
 def _cluster_logs(embeddings: np.ndarray):
     algorithm = os.getenv("CLUSTERING_ALGORITHM")
     if algorithm.lower() == "dbscan":
         # DBSCAN - Good for finding clusters of varying shapes and handling noise
         # Uses cosine distance for text similarity
-        distance_matrix = cosine_distances(embeddings)
+        distance_matrix = _cosine_radius_graph(embeddings, max_distance=0.3)
         cluster_model = DBSCAN(eps=0.3, min_samples=2, metric="precomputed")
         cluster_labels = cluster_model.fit_predict(distance_matrix)
 
     elif algorithm.lower() == "meanshift":
         # Mean Shift - Automatically determines number of clusters
-        cluster_model = MeanShift(bandwidth=None)  # Auto-estimate bandwidth
+        # Estimate the bandwidth on a subsample, estimating it from all logs is
+        # O(N^2); the clustering itself still runs on every log
+        bandwidth = estimate_bandwidth(
+            embeddings,
+            n_samples=min(len(embeddings), MEANSHIFT_BANDWIDTH_SAMPLES),
+            random_state=0,
+        )
+        cluster_model = MeanShift(bandwidth=bandwidth, n_jobs=-1)
         cluster_labels = cluster_model.fit_predict(embeddings)
 
     elif algorithm.lower() == "agglomerative":
@@ -150,7 +357,7 @@ def _cluster_logs(embeddings: np.ndarray):
         cluster_model = AgglomerativeClustering(
             n_clusters=None, distance_threshold=0.5, linkage="average", metric="cosine"
         )
-        cluster_labels = cluster_model.fit_predict(embeddings)
+        cluster_labels = _agglomerative_by_component(embeddings, cluster_model)
 
     else:
         raise ValueError(
@@ -159,6 +366,12 @@ def _cluster_logs(embeddings: np.ndarray):
     return cluster_model, cluster_labels
 
 
+@lru_cache(maxsize=2)
+def _load_cluster_model(model_path: str, mtime: float):
+    # Keyed by modification time, so a retrained model is picked up
+    return joblib.load(model_path, mmap_mode="r")
+
+
 def infer_cluster_log(log: str):
     embeddings = _embed_logs([log])
     if os.getenv("CLUSTERING_HOST"):
@@ -168,7 +381,8 @@ def infer_cluster_log(log: str):
         )
         label_as_int = response.json()["labels"][0]
     else:
-        cluster_model = joblib.load(os.getenv("TMP_CLUSTER_MODEL_PATH"))
+        model_path = os.getenv("TMP_CLUSTER_MODEL_PATH")
+        cluster_model = _load_cluster_model(model_path, os.path.getmtime(model_path))
         cluster_label = cluster_model.predict(embeddings)
         label_as_int = cluster_label.tolist()[0]
     return str(label_as_int)
@@ -209,8 +423,8 @@ def train_embed_and_cluster_logs(
     if not logs:
         return []
 
-    # Embed logs
-    embeddings = _embed_logs(logs)
+    # Embed logs (cache hits are only reported for batches, not per alert)
+    embeddings = _embed_logs(logs, log_cache_hits=True)
 
     # Train clustering model
     cluster_model, cluster_labels = _cluster_logs(embeddings)
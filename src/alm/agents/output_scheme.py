@@ -1,4 +1,4 @@
-from typing import Literal
+from typing import List, Literal
 
 from pydantic import BaseModel, Field
 
@@ -21,6 +21,19 @@ class ClassifySchema(BaseModel):
     ] = Field(description="Category of the log")
 
 
+# structured output for several logs summarized or classified in one request
+class SummaryBatchSchema(BaseModel):
+    summaries: List[SummarySchema] = Field(
+        description="One summary per log, in the same order as the logs"
+    )
+
+
+class ClassifyBatchSchema(BaseModel):
+    categories: List[ClassifySchema] = Field(
+        description="One category per log summary, in the same order as the summaries"
+    )
+
+
 class SuggestStepByStepSolutionSchema(BaseModel):
     step_by_step_solution: str = Field(
         description="Step by step solution to the problem"
@@ -1,5 +1,6 @@
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
@@ -30,8 +31,8 @@ def shrink_long_logs(log: str) -> str:
     return log.split(r'"properties": ')[0][:30_000] if len(log) > 30_000 else log
 
 
-def grafana_alert_mock(path: str) -> Optional[GrafanaAlert]:
-    """Mock the Grafana alerting system."""
+def _parse_log_file(path: str) -> Optional[dict]:
+    """Return the groups of the last error match in a log file."""
     with open(path, "r") as file:
         content = file.read()
     matches = _filter_matches_end_with_ignoring(
@@ -51,8 +52,10 @@ def grafana_alert_mock(path: str) -> Optional[GrafanaAlert]:
 
     # Get the last match
     last_match = matches[-1]
-    groups = last_match.groupdict()
+    return last_match.groupdict()
+
 
+def _alert_from_groups(path: str, groups: dict) -> GrafanaAlert:
     # Create GrafanaAlert instance with extracted data
     alert = GrafanaAlert(
         logTimestamp=(
@@ -78,15 +81,32 @@ def grafana_alert_mock(path: str) -> Optional[GrafanaAlert]:
     return alert
 
 
+def grafana_alert_mock(path: str) -> Optional[GrafanaAlert]:
+    """Mock the Grafana alerting system."""
+    groups = _parse_log_file(path)
+    return None if groups is None else _alert_from_groups(path, groups)
+
+
 def ingest_alerts(directory: str) -> list[GrafanaAlert]:
     """Ingest alerts from a directory."""
     alerts = []
     error_count = 0
     success_count = 0
-    for file in os.listdir(directory):
-        if file.endswith(".txt"):
+    paths = [
+        os.path.join(directory, file)
+        for file in os.listdir(directory)
+        if file.endswith(".txt")
+    ]
+    # Regex matching is CPU-bound, so the files are parsed in worker processes;
+    # only the match groups are sent back and alerts are built here
+    with ProcessPoolExecutor() as executor:
+        futures = [executor.submit(_parse_log_file, path) for path in paths]
+        for path, future in zip(paths, futures):
             try:
-                alerts.append(grafana_alert_mock(os.path.join(directory, file)))
+                groups = future.result()
+                alerts.append(
+                    None if groups is None else _alert_from_groups(path, groups)
+                )
                 success_count += 1
             except Exception:
                 error_count += 1
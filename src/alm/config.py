@@ -96,12 +96,49 @@ class StorageConfig:
         )
 
 
+# Scalar quantizer factory codes by RAG_QUANT value
+_QUANT_ENCODINGS = {"fp16": "SQfp16", "int8": "SQ8"}
+
+
+class IndexConfig:
+    """Configuration for the FAISS index type and its search parameters."""
+
+    def __init__(self):
+        # faiss.index_factory string, e.g. "Flat", "HNSW32,Flat" or "IVF256,PQ32"
+        self.factory = os.getenv("RAG_INDEX_FACTORY", "Flat")
+        # Stored vector precision for Flat storage: "none" (fp32), "fp16" or "int8"
+        self.quant = os.getenv("RAG_QUANT", "none").lower()
+        # Inverted lists visited per query (IVF indexes)
+        self.nprobe = int(os.getenv("RAG_NPROBE", "16"))
+        # Candidate list size per query (HNSW indexes)
+        self.ef_search = int(os.getenv("RAG_EFSEARCH", "64"))
+
+    @property
+    def build_factory(self) -> str:
+        """The factory string with its Flat storage swapped for RAG_QUANT's."""
+        encoding = _QUANT_ENCODINGS.get(self.quant)
+        if encoding is None or not self.factory.endswith("Flat"):
+            return self.factory
+        return self.factory.removesuffix("Flat") + encoding
+
+    def __repr__(self):
+        return (
+            f"IndexConfig(\n"
+            f"  factory={self.factory}\n"
+            f"  quant={self.quant}\n"
+            f"  nprobe={self.nprobe}\n"
+            f"  ef_search={self.ef_search}\n"
+            f")"
+        )
+
+
 class Config:
     """Main configuration object."""
 
     def __init__(self):
         self.embeddings = EmbeddingsConfig()
         self.storage = StorageConfig()
+        self.index = IndexConfig()
 
     def validate(self):
         """Validate all configuration."""
@@ -115,6 +152,7 @@ class Config:
         print("=" * 70)
         print(self.embeddings)
         print(self.storage)
+        print(self.index)
         print("=" * 70)
 
 
@@ -3,9 +3,9 @@ from __future__ import annotations
 import os
 from typing import Generator
 
-from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlmodel.ext.asyncio.session import AsyncSession
-from alm.models import GrafanaAlert
+from alm.models import GrafanaAlert, LLMCache
 
 # Create SQLModel engine
 engine = create_async_engine(
@@ -14,18 +14,33 @@ engine = create_async_engine(
     .replace("postgresql", "postgresql+asyncpg")
 )
 
+# Session factory created once and reused, so every session shares the
+# engine's connection pool
+session_factory = async_sessionmaker(
+    bind=engine, class_=AsyncSession, expire_on_commit=False
+)
+
 
 # Create tables
 async def init_tables(delete_tables=False):
     async with engine.begin() as conn:
         if delete_tables:
             print("Starting to delete tables")
-            await conn.run_sync(GrafanaAlert.metadata.drop_all)
+            # The LLM cache is kept, so re-runs can skip repeated logs
+            await conn.run_sync(
+                GrafanaAlert.metadata.drop_all, tables=[GrafanaAlert.__table__]
+            )
         await conn.run_sync(GrafanaAlert.metadata.create_all)
 
 
+async def init_llm_cache_table():
+    """Create the offline pipeline's LLM cache table if the database lacks it."""
+    async with engine.begin() as conn:
+        await conn.run_sync(LLMCache.__table__.create, checkfirst=True)
+
+
 def get_session():
-    session = AsyncSession(engine)
+    session = session_factory()
     return session
 
 
@@ -1,4 +1,5 @@
 import os
+from functools import cache
 
 from langchain_openai import ChatOpenAI
 
@@ -21,6 +22,7 @@ if not API_KEY or not BASE_URL:
 # set_debug(True)  # Enables LangChain debug mode globally
 
 
+@cache
 def get_llm(model: str = MODEL, temperature: float = TEMPERATURE):
     llm = ChatOpenAI(
         api_key=API_KEY,
@@ -29,3 +31,16 @@ def get_llm(model: str = MODEL, temperature: float = TEMPERATURE):
         temperature=temperature,
     )
     return llm
+
+
+# with_structured_output runnables by (llm, schema); building one converts the
+# schema to a tool definition. The llm is kept so its id isn't reused
+_structured_llms = {}
+
+
+def structured_llm(llm, schema):
+    """llm.with_structured_output(schema), built once per llm and schema."""
+    key = (id(llm), schema)
+    if key not in _structured_llms:
+        _structured_llms[key] = (llm, llm.with_structured_output(schema))
+    return _structured_llms[key][1]
@@ -46,3 +46,14 @@ class GrafanaAlert(SQLModel, table=True):
 
     # log_type: Optional[str] = None
     # task_name: Optional[str] = None
+
+
+class LLMCache(SQLModel, table=True):
+    """LLM outputs of the offline pipeline, keyed by a hash of the log message."""
+
+    hash: str = Field(primary_key=True, description="Hash of the log message")
+    summary: Optional[str] = Field(default=None, description="Cached log summary")
+    category: Optional[str] = Field(default=None, description="Cached log category")
+    solution: Optional[str] = Field(
+        default=None, description="Cached step by step solution"
+    )
@@ -1,4 +1,6 @@
 import asyncio
+import hashlib
+import os
 import time
 
 from alm.database import get_session
@@ -7,21 +9,58 @@ from alm.llm import get_llm
 
 from alm.agents.node import (
     train_embed_and_cluster_logs,
-    summarize_log,
-    classify_log,
+    summarize_logs_batch,
+    classify_logs_batch,
+    gather_bounded,
     suggest_step_by_step_solution,
 )
-from alm.models import GrafanaAlert
-from sqlmodel import select
+from alm.models import GrafanaAlert, LLMCache
+from sqlmodel import col, select
 
-from alm.database import init_tables
+from alm.database import init_llm_cache_table, init_tables
 
 
-async def _add_or_update_alert(alert):
+# Upper bound on LLM requests in flight at once
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "32"))
+
+
+async def _add_or_update_alerts(alerts):
+    async with get_session() as db:
+        db.add_all(alerts)
+        await db.commit()
+
+
+def _log_hash(log: str) -> str:
+    return hashlib.blake2b(log.encode(), digest_size=16).hexdigest()
+
+
+async def _load_llm_cache(log_hashes):
+    async with get_session() as db:
+        entries = await db.exec(
+            select(LLMCache).where(col(LLMCache.hash).in_(set(log_hashes)))
+        )
+        return {entry.hash: entry for entry in entries.all()}
+
+
+async def _save_llm_cache(llm_cache, log_hashes, **fields):
+    """Store the generated fields (summary, category, solution) for each hash."""
+    for i, log_hash in enumerate(log_hashes):
+        entry = llm_cache.setdefault(log_hash, LLMCache(hash=log_hash))
+        for field, values in fields.items():
+            setattr(entry, field, values[i])
     async with get_session() as db:
-        db.add(alert)
+        db.add_all(llm_cache.values())
         await db.commit()
-        await db.refresh(alert)
+
+
+async def _fill_cache_misses(values, compute):
+    """Replace the None entries of values with compute(indices of the misses)."""
+    missing = [i for i, value in enumerate(values) if value is None]
+    if missing:
+        for i, value in zip(missing, await compute(missing)):
+            values[i] = value
+    print(f"cache hits {len(values) - len(missing)}/{len(values)}")
+    return values
 
 
 async def whole_pipeline():
@@ -31,6 +70,7 @@ async def whole_pipeline():
         generate_log_categories=True,
         generate_step_by_step_solutions=True,
         restart_db=True,
+        use_llm_cache=True,
     )
 
 
@@ -70,6 +110,7 @@ async def _pipeline(
     generate_log_categories=True,
     generate_step_by_step_solutions=True,
     restart_db=False,
+    use_llm_cache=False,
 ):
     llm = get_llm()
     print("starting pipeline")
@@ -98,13 +139,30 @@ async def _pipeline(
     unique_cluster = {label: alert for alert, label in zip(alerts, cluster_labels)}
     candidate_alerts = list(unique_cluster.values())
 
+    # Reuse LLM outputs of earlier runs for identical log messages. Without
+    # use_llm_cache everything is regenerated and the cache table is untouched
+    log_hashes = [_log_hash(alert.logMessage) for alert in candidate_alerts]
+    llm_cache = {}
+    if use_llm_cache:
+        # Databases created before the cache existed don't have its table
+        await init_llm_cache_table()
+        llm_cache = await _load_llm_cache(log_hashes)
+    cached_entries = [llm_cache.get(log_hash) for log_hash in log_hashes]
+    generated_fields = {}
+
     # Create log summaries
     if generate_log_summaries:
         print("generating log summaries")
         start_time = time.time()
-        log_summaries = await asyncio.gather(
-            *[summarize_log(alert.logMessage, llm) for alert in candidate_alerts]
+        log_summaries = await _fill_cache_misses(
+            [entry and entry.summary for entry in cached_entries],
+            lambda missing: summarize_logs_batch(
+                [candidate_alerts[i].logMessage for i in missing],
+                llm,
+                max_concurrency=LLM_CONCURRENCY,
+            ),
         )
+        generated_fields["summary"] = log_summaries
         elapsed_time = time.time() - start_time
         print(
             f"log_summaries finished {len(log_summaries)} - Time: {elapsed_time:.2f}s"
@@ -112,40 +170,58 @@ async def _pipeline(
     else:
         log_summaries = [alert.logSummary for alert in candidate_alerts]
 
-    # Create log Category
-    if generate_log_categories:
+    # Categories and step by step solutions both only depend on the summaries,
+    # so the two stages run concurrently
+    async def _create_log_categories():
+        if not generate_log_categories:
+            return [alert.expertClassification for alert in candidate_alerts]
         print("generating log categories")
         start_time = time.time()
-        log_expert_calssification = await asyncio.gather(
-            *[classify_log(log_summary, llm) for log_summary in log_summaries]
+        log_categories = await _fill_cache_misses(
+            [entry and entry.category for entry in cached_entries],
+            lambda missing: classify_logs_batch(
+                [log_summaries[i] for i in missing],
+                llm,
+                max_concurrency=LLM_CONCURRENCY,
+            ),
         )
+        generated_fields["category"] = log_categories
         elapsed_time = time.time() - start_time
         print(
-            f"log categories finished {len(log_expert_calssification)} - Time: {elapsed_time:.2f}s"
+            f"log categories finished {len(log_categories)} - Time: {elapsed_time:.2f}s"
         )
-    else:
-        log_expert_calssification = [
-            alert.expertClassification for alert in candidate_alerts
-        ]
+        return log_categories
 
-    # # Create step by step solution
-    if generate_step_by_step_solutions:
+    async def _create_step_by_step_solutions():
+        if not generate_step_by_step_solutions:
+            return [alert.stepByStepSolution for alert in candidate_alerts]
         print("generating step by step solutions")
         start_time = time.time()
-        step_by_step_solutions = await asyncio.gather(
-            *[
-                suggest_step_by_step_solution(log_summary, alert.logMessage, llm)
-                for log_summary, alert in zip(log_summaries, candidate_alerts)
-            ]
+        solutions = await _fill_cache_misses(
+            [entry and entry.solution for entry in cached_entries],
+            lambda missing: gather_bounded(
+                (
+                    suggest_step_by_step_solution(
+                        log_summaries[i], candidate_alerts[i].logMessage, llm
+                    )
+                    for i in missing
+                ),
+                LLM_CONCURRENCY,
+            ),
         )
+        generated_fields["solution"] = solutions
         elapsed_time = time.time() - start_time
         print(
-            f"step by step solutions finished {len(step_by_step_solutions)} - Time: {elapsed_time:.2f}s"
+            f"step by step solutions finished {len(solutions)} - Time: {elapsed_time:.2f}s"
         )
-    else:
-        step_by_step_solutions = [
-            alert.stepByStepSolution for alert in candidate_alerts
-        ]
+        return solutions
+
+    log_expert_calssification, step_by_step_solutions = await asyncio.gather(
+        _create_log_categories(), _create_step_by_step_solutions()
+    )
+
+    if use_llm_cache and generated_fields:
+        await _save_llm_cache(llm_cache, log_hashes, **generated_fields)
 
     # update alerts fields by label
     for alert, log_summary, log_expert_calssification, step_by_step_solution in zip(
@@ -168,6 +244,6 @@ async def _pipeline(
 
     # update database
     start_time = time.time()
-    await asyncio.gather(*[_add_or_update_alert(alert) for alert in alerts])
+    await _add_or_update_alerts(alerts)
     elapsed_time = time.time() - start_time
     print(f"database alerts added - Time: {elapsed_time:.2f}s")
@@ -15,6 +15,7 @@ Supports both local models and API-based embeddings via environment variables.
 
 import os
 import pickle
+from itertools import batched
 import numpy as np
 import requests
 from typing import List, Dict, Any, Tuple, Optional
@@ -90,6 +91,7 @@ class EmbeddingClient:
         texts: List[str],
         normalize_embeddings: bool = True,
         show_progress_bar: bool = True,
+        batch_size: int = 128,
     ) -> np.ndarray:
         """
         Encode texts to embeddings.
@@ -98,39 +100,54 @@ class EmbeddingClient:
             texts: List of texts to embed
             normalize_embeddings: Whether to L2-normalize embeddings
             show_progress_bar: Whether to show progress bar (local only)
+            batch_size: Number of texts embedded per model call / API request
 
         Returns:
             Numpy array of embeddings
         """
         if self.is_local:
-            return self._encode_local(texts, normalize_embeddings, show_progress_bar)
+            return self._encode_local(
+                texts, normalize_embeddings, show_progress_bar, batch_size
+            )
         else:
-            return self._encode_api(texts, normalize_embeddings)
+            return self._encode_api(texts, normalize_embeddings, batch_size)
 
     def _encode_local(
-        self, texts: List[str], normalize_embeddings: bool, show_progress_bar: bool
+        self,
+        texts: List[str],
+        normalize_embeddings: bool,
+        show_progress_bar: bool,
+        batch_size: int,
     ) -> np.ndarray:
         """Encode using local model."""
         return self.model.encode(
             texts,
+            batch_size=batch_size,
             convert_to_numpy=True,
             normalize_embeddings=normalize_embeddings,
             show_progress_bar=show_progress_bar,
         )
 
-    def _encode_api(self, texts: List[str], normalize_embeddings: bool) -> np.ndarray:
+    def _encode_api(
+        self, texts: List[str], normalize_embeddings: bool, batch_size: int
+    ) -> np.ndarray:
         """Encode using API."""
         print(f"Encoding {len(texts)} texts via API...")
 
         # Nomic API format
         if "nomic" in self.api_url.lower():
-            embeddings = self._encode_nomic_api(texts)
+            encode_batch = self._encode_nomic_api
         # OpenAI API format
         elif "openai" in self.api_url.lower():
-            embeddings = self._encode_openai_api(texts)
+            encode_batch = self._encode_openai_api
         else:
             # Generic API format
-            embeddings = self._encode_generic_api(texts)
+            encode_batch = self._encode_generic_api
+
+        # Send the texts in batches to stay within API request size limits
+        embeddings = []
+        for batch in batched(texts, batch_size):
+            embeddings.extend(encode_batch(list(batch)))
 
         embeddings = np.array(embeddings)
 
@@ -217,6 +234,16 @@ class EmbeddingClient:
         return response.json()["embeddings"]
 
 
+def _set_search_parameters(index: faiss.Index):
+    """Apply the configured nprobe / efSearch if the index is IVF / HNSW based."""
+    ivf_index = faiss.try_extract_index_ivf(index)
+    if ivf_index is not None:
+        ivf_index.nprobe = config.index.nprobe
+    hnsw = getattr(faiss.downcast_index(index), "hnsw", None)
+    if hnsw is not None:
+        hnsw.efSearch = config.index.ef_search
+
+
 class AnsibleErrorEmbedder:
     """
     Handles embedding generation and FAISS index creation for Ansible errors.
@@ -430,9 +457,21 @@ class AnsibleErrorEmbedder:
             f"Embedding norms: min={norms.min():.4f}, max={norms.max():.4f}, mean={norms.mean():.4f}"
         )
 
-        # Create FAISS index
-        print(f"Building FAISS IndexFlatIP with dimension {self.embedding_dim}...")
-        self.index = faiss.IndexFlatIP(self.embedding_dim)
+        # Create FAISS index (exact inner product search unless configured otherwise)
+        factory = config.index.build_factory
+        print(f"Building FAISS {factory} index with dimension {self.embedding_dim}...")
+        self.index = faiss.index_factory(
+            self.embedding_dim, factory, faiss.METRIC_INNER_PRODUCT
+        )
+        if not self.index.is_trained:
+            try:
+                self.index.train(embeddings)
+            except RuntimeError as e:
+                # IVF/PQ need many more vectors than clusters/centroids to train
+                print(f"⚠ Cannot train {factory} on {len(embeddings)} vectors: {e}")
+                print("  Falling back to an exact Flat index")
+                self.index = faiss.IndexFlatIP(self.embedding_dim)
+        _set_search_parameters(self.index)
 
         # Add vectors to index
         self.index.add(embeddings)
@@ -490,6 +529,7 @@ class AnsibleErrorEmbedder:
             raise FileNotFoundError(f"Index not found at {self.index_path}")
 
         self.index = faiss.read_index(self.index_path)
+        _set_search_parameters(self.index)
         print(f"✓ FAISS index loaded: {self.index.ntotal} vectors")
 
         if not os.path.exists(self.metadata_path):
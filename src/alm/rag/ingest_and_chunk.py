@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import bisect
+import itertools
 import re
 import uuid
 from typing import List, Dict, Any
@@ -248,6 +250,10 @@ class AnsibleErrorParser:
     ) -> List[Dict[str, Any]]:
         """Extract individual error entries from the (reflowed) PDF documents."""
         full_text = "\n".join([doc.page_content for doc in documents])
+        # End offset of each page in full_text (+1 for the joining newline)
+        page_ends = list(
+            itertools.accumulate(len(doc.page_content) + 1 for doc in documents)
+        )
 
         error_matches = list(self.error_title_pattern.finditer(full_text))
         print(f"[DEBUG] Found {len(error_matches)} error title matches")
@@ -266,7 +272,7 @@ class AnsibleErrorParser:
             error_text = full_text[error_start:error_end]
             error_title = match.group(0).strip()
 
-            page_num = self._find_page_number(documents, error_start)
+            page_num = self._find_page_number(page_ends, error_start)
 
             parsed_error = self._parse_error_sections(
                 error_text=error_text,
@@ -279,16 +285,10 @@ class AnsibleErrorParser:
         print(f"✓ Extracted {len(errors)} error entries")
         return errors
 
-    def _find_page_number(self, documents: List[Document], char_position: int) -> int:
+    def _find_page_number(self, page_ends: List[int], char_position: int) -> int:
         """Approximate page for a character position (post-reflow)."""
-        current_pos = 0
-        for i, doc in enumerate(documents):
-            current_pos += (
-                len(doc.page_content) + 1
-            )  # +1 for the newline added when joining
-            if char_position < current_pos:
-                return i + 1
-        return len(documents)
+        # First page ending after char_position, or the last page
+        return min(bisect.bisect_right(page_ends, char_position) + 1, len(page_ends))
 
     def _reflow_prose_block(self, text: str) -> str:
         """
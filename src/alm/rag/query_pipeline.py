@@ -137,6 +137,24 @@ class AnsibleErrorQueryPipeline:
         Returns:
             QueryResponse with ranked error results
         """
+        return self.query_batch([log_summary], top_k, top_n, similarity_threshold)[0]
+
+    def query_batch(
+        self,
+        log_summaries: List[str],
+        top_k: Optional[int] = None,
+        top_n: Optional[int] = None,
+        similarity_threshold: Optional[float] = None,
+    ) -> List[QueryResponse]:
+        """
+        Query the RAG system with several log summaries at once.
+
+        The summaries are embedded in one encode call and searched with one
+        FAISS search over the whole query matrix.
+
+        Returns:
+            One QueryResponse per log summary (same order as input)
+        """
         start_time = time.time()
 
         # Use defaults if not overridden
@@ -147,102 +165,116 @@ class AnsibleErrorQueryPipeline:
         print(f"\n{'=' * 70}")
         print("QUERYING RAG SYSTEM")
         print(f"{'=' * 70}")
-        print(f"Query: {log_summary[:100]}{'...' if len(log_summary) > 100 else ''}")
+        for log_summary in log_summaries:
+            print(
+                f"Query: {log_summary[:100]}{'...' if len(log_summary) > 100 else ''}"
+            )
         print(
             f"Parameters: top_k={top_k}, top_n={top_n}, threshold={similarity_threshold}"
         )
 
-        # Step 5.1: Receive log summary (done)
+        # Step 5.1: Receive log summaries (done)
 
-        # Step 5.2: Generate embedding for log summary
-        query_embedding = self._generate_query_embedding(log_summary)
+        # Step 5.2: Generate embeddings for the log summaries
+        query_embeddings = self._generate_query_embeddings(log_summaries)
 
         # Step 5.3: Similarity search in FAISS
-        candidates = self._similarity_search(query_embedding, top_k)
+        candidates_per_query = self._similarity_search(query_embeddings, top_k)
 
         # Step 5.4: Fetch complete error data (already done in similarity_search)
 
-        # Step 5.5: Filter by similarity threshold
-        filtered_results = self._filter_by_threshold(candidates, similarity_threshold)
-
-        # Step 5.6: Rank and return top-N errors
-        final_results = self._rank_and_select(filtered_results, top_n)
-
-        # Calculate metadata
         search_time_ms = (time.time() - start_time) * 1000
-
-        metadata = {
-            "num_results": len(final_results),
-            "num_candidates": len(candidates),
-            "num_filtered": len(filtered_results),
-            "search_time_ms": round(search_time_ms, 2),
-            "top_k": top_k,
-            "top_n": top_n,
-            "similarity_threshold": similarity_threshold,
-            "model": self.embedder.model_name,
-        }
-
         print(f"\n✓ Query complete in {search_time_ms:.2f}ms")
-        print(f"  Retrieved: {len(candidates)} candidates")
-        print(f"  Filtered: {len(filtered_results)} above threshold")
-        print(f"  Returned: {len(final_results)} results")
 
-        return QueryResponse(
-            query=log_summary, results=final_results, metadata=metadata
-        )
+        responses = []
+        for log_summary, candidates in zip(log_summaries, candidates_per_query):
+            # Step 5.5: Filter by similarity threshold
+            filtered_results = self._filter_by_threshold(
+                candidates, similarity_threshold
+            )
+
+            # Step 5.6: Rank and return top-N errors
+            final_results = self._rank_and_select(filtered_results, top_n)
+
+            metadata = {
+                "num_results": len(final_results),
+                "num_candidates": len(candidates),
+                "num_filtered": len(filtered_results),
+                "search_time_ms": round(search_time_ms, 2),
+                "top_k": top_k,
+                "top_n": top_n,
+                "similarity_threshold": similarity_threshold,
+                "model": self.embedder.model_name,
+            }
+
+            print(f"  Retrieved: {len(candidates)} candidates")
+            print(f"  Filtered: {len(filtered_results)} above threshold")
+            print(f"  Returned: {len(final_results)} results")
+
+            responses.append(
+                QueryResponse(
+                    query=log_summary, results=final_results, metadata=metadata
+                )
+            )
+        return responses
 
-    def _generate_query_embedding(self, log_summary: str) -> np.ndarray:
+    def _generate_query_embeddings(self, log_summaries: List[str]) -> np.ndarray:
         """
-        Generate embedding for the query.
+        Generate embeddings for the queries, one row per log summary.
 
         Step 5.2: Uses same model as indexing, with query-specific prefix for Nomic.
         """
-        print("\nStep 5.2: Generating query embedding...")
+        print("\nStep 5.2: Generating query embeddings...")
 
         # Add task prefix for Nomic models
         use_task_prefix = "nomic" in self.embedder.model_name.lower()
 
         if use_task_prefix:
-            query_text = f"search_query: {log_summary}"
+            query_texts = [f"search_query: {summary}" for summary in log_summaries]
             print("  Using task prefix: 'search_query:'")
         else:
-            query_text = log_summary
+            query_texts = log_summaries
 
-        # Generate embedding
-        embedding = self.embedder.client.encode(
-            [query_text], normalize_embeddings=True, show_progress_bar=False
-        )[0]
+        # Generate embeddings
+        embeddings = self.embedder.client.encode(
+            query_texts, normalize_embeddings=True, show_progress_bar=False
+        )
 
         # Verify normalization
-        norm = np.linalg.norm(embedding)
-        print(f"  ✓ Embedding generated (norm={norm:.4f})")
+        norms = np.linalg.norm(embeddings, axis=1)
+        print(
+            f"  ✓ {len(embeddings)} embeddings generated "
+            f"(norm={norms.min():.4f}-{norms.max():.4f})"
+        )
 
-        return embedding
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
 
     def _similarity_search(
-        self, query_embedding: np.ndarray, top_k: int
-    ) -> List[ErrorResult]:
+        self, query_embeddings: np.ndarray, top_k: int
+    ) -> List[List[ErrorResult]]:
         """
         Perform similarity search in FAISS.
 
-        Step 5.3: Retrieves top-k most similar error embeddings.
+        Step 5.3: Retrieves the top-k most similar error embeddings for each
+        query row, with a single search call.
         """
         print(f"\nStep 5.3: Similarity search (top-k={top_k})...")
 
-        # Reshape for FAISS (needs 2D array)
-        query_vector = query_embedding.reshape(1, -1)
-
         # Search FAISS index
         # Returns: distances (similarity scores), indices (positions in index)
-        similarities, indices = self.embedder.index.search(query_vector, top_k)
+        similarities, indices = self.embedder.index.search(query_embeddings, top_k)
 
-        # Flatten results
-        similarities = similarities[0]
-        indices = indices[0]
+        return [
+            self._fetch_error_results(row_similarities, row_indices)
+            for row_similarities, row_indices in zip(similarities, indices)
+        ]
 
+    def _fetch_error_results(
+        self, similarities: np.ndarray, indices: np.ndarray
+    ) -> List[ErrorResult]:
+        """Step 5.4: Fetch complete error data for one query's search results."""
         print(f"  ✓ Found {len(indices)} candidates")
 
-        # Step 5.4: Fetch complete error data
         results = []
         for idx, similarity in zip(indices, similarities):
             # Handle case where FAISS returns -1 for not enough results
@@ -0,0 +1,66 @@
+import asyncio
+
+
+class AutoBatcher:
+    """
+    Collects concurrent ainvoke calls on a runnable and dispatches them together.
+
+    Calls arriving within max_wait_ms of the first one (up to max_batch of them)
+    are sent as a single abatch call, and each caller gets its own result.
+    """
+
+    def __init__(self, runnable, max_batch: int, max_wait_ms: float):
+        self._runnable = runnable
+        self._max_batch = max_batch
+        self._max_wait = max_wait_ms / 1000
+        self._loop = None
+        self._queue = None
+        self._tasks = set()
+
+    async def ainvoke(self, input):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Queues are bound to an event loop, so start a worker per loop
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._spawn(self._drain(self._queue))
+        future = loop.create_future()
+        await self._queue.put((input, future))
+        return await future
+
+    def _spawn(self, coro):
+        # Keep a reference so pending tasks aren't garbage collected
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _drain(self, queue: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self._max_wait
+            while len(batch) < self._max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except TimeoutError:
+                    break
+            # Dispatch in the background and keep collecting the next batch
+            self._spawn(self._dispatch(batch))
+
+    async def _dispatch(self, batch):
+        try:
+            results = await self._runnable.abatch(
+                [input for input, _ in batch], return_exceptions=True
+            )
+        except Exception as e:
+            results = [e] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if future.done():  # caller was cancelled
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -1,5 +1,8 @@
 import re
 
+# A fatal task result, e.g. "fatal: [host]: FAILED! => ..."
+_FATAL_ERROR_RE = re.compile(r"fatal: \[.*?\]")
+
 
 def check_if_ansible_log_should_be_ignored(log: str) -> bool:
     """Check if the log should be ignored."""
@@ -13,5 +16,5 @@ def check_if_ansible_log_should_be_ignored(log: str) -> bool:
 def _is_include_fatal_error(log: str) -> bool:
     """Check if the log include a fatal error using regex."""
 
-    fatal_error_regex = r"fatal: \[.*?\]"
-    return re.search(fatal_error_regex, log) is not None
+    # The substring test rejects logs without the marker before running the regex
+    return "fatal: [" in log and _FATAL_ERROR_RE.search(log) is not None
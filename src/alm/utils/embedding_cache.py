@@ -0,0 +1,134 @@
+import hashlib
+import os
+import sqlite3
+from collections import OrderedDict
+from functools import cache
+from typing import List
+
+import numpy as np
+import torch
+from sentence_transformers import SentenceTransformer
+
+# Largest number of keys in one SQLite IN (...) lookup
+_SQLITE_LOOKUP_BATCH = 500
+
+
+class CachedEncoder:
+    """
+    Sentence-transformer encoding that only embeds texts it hasn't seen before.
+
+    Embeddings are keyed by a hash of the text and kept in an in-process LRU
+    plus a SQLite file under cache_dir, so they also survive restarts.
+    """
+
+    def __init__(self, model_name: str, cache_dir: str, max_entries: int = 100_000):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self._memory: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._model = None
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._db = sqlite3.connect(
+                os.path.join(cache_dir, f"{model_name.replace('/', '_')}.sqlite"),
+                check_same_thread=False,
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)"
+            )
+        except (OSError, sqlite3.Error) as e:
+            print(f"Embedding cache not persisted ({cache_dir}): {e}")
+            self._db = None
+
+    @property
+    def model(self) -> SentenceTransformer:
+        """The sentence transformer, loaded on first use and kept for the process."""
+        if self._model is None:
+            if torch.cuda.is_available():
+                # Half precision halves the memory and roughly doubles throughput
+                self._model = SentenceTransformer(self.model_name, device="cuda")
+                self._model.half()
+            else:
+                self._model = SentenceTransformer(self.model_name, device="cpu")
+        return self._model
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _load_persisted(self, keys: List[str]) -> dict:
+        if self._db is None:
+            return {}
+        vectors = {}
+        for start in range(0, len(keys), _SQLITE_LOOKUP_BATCH):
+            batch = keys[start : start + _SQLITE_LOOKUP_BATCH]
+            rows = self._db.execute(
+                "SELECT key, vector FROM embeddings WHERE key IN "
+                f"({','.join('?' * len(batch))})",
+                batch,
+            )
+            for key, vector in rows:
+                vectors[key] = np.frombuffer(vector, dtype=np.float32)
+        return vectors
+
+    def _persist(self, vectors: dict):
+        if self._db is None or not vectors:
+            return
+        try:
+            with self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(key, vector.tobytes()) for key, vector in vectors.items()],
+                )
+        except sqlite3.Error as e:
+            print(f"Error persisting embeddings: {e}")
+
+    def encode(
+        self,
+        texts: List[str],
+        show_progress_bar: bool = False,
+        log_cache_hits: bool = False,
+    ) -> np.ndarray:
+        keys = [self._key(text) for text in texts]
+
+        vectors = {}
+        for key in keys:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                vectors[key] = self._memory[key]
+        vectors.update(
+            self._load_persisted(list({key for key in keys if key not in vectors}))
+        )
+
+        # Encode each missing text once, even if it repeats in texts
+        misses = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        if log_cache_hits:
+            print(f"embedding cache hits {len(keys) - len(misses)}/{len(keys)}")
+        if misses:
+            embeddings = self.model.encode(
+                list(misses.values()),
+                # Larger batches keep a GPU saturated, on CPU they only add padding
+                batch_size=256 if self.model.device.type == "cuda" else 32,
+                convert_to_numpy=True,
+                show_progress_bar=show_progress_bar,
+            ).astype(np.float32, copy=False)
+            new_vectors = dict(zip(misses, embeddings))
+            self._persist(new_vectors)
+            vectors.update(new_vectors)
+
+        for key, vector in vectors.items():
+            self._remember(key, vector)
+        return np.stack([vectors[key] for key in keys])
+
+
+@cache
+def get_cached_encoder(model_name: str) -> CachedEncoder:
+    cache_dir = os.getenv(
+        "EMBEDDINGS_CACHE_DIR", os.path.expanduser("~/.cache/alm/embeddings")
+    )
+    return CachedEncoder(model_name, cache_dir)
@@ -0,0 +1,27 @@
+from functools import cache
+from importlib.resources import files
+
+
+@cache
+def load_prompt(path: str) -> str:
+    """
+    Read a prompt file shipped in the alm package, e.g. "agents/prompts/x.md".
+
+    Resolved through importlib.resources, so it works from any working
+    directory, and each file is only read once per process.
+    """
+    return files("alm").joinpath(path).read_text()
+
+
+def compile_prompt(prompt: str, *placeholders: str) -> str:
+    """
+    Turn a markdown prompt into a str.format_map template.
+
+    Literal braces (JSON examples, shell snippets) are escaped and only the
+    given {placeholder} markers stay fields, so all of them are filled in a
+    single pass.
+    """
+    prompt = prompt.replace("{", "{{").replace("}", "}}")
+    for placeholder in placeholders:
+        prompt = prompt.replace(f"{{{{{placeholder}}}}}", f"{{{placeholder}}}")
+    return prompt
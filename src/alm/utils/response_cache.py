@@ -0,0 +1,65 @@
+import hashlib
+import os
+from collections import OrderedDict
+from functools import wraps
+
+# Reuse LLM responses for identical inputs (off unless LLM_RESPONSE_CACHE is set)
+LLM_RESPONSE_CACHE = os.getenv("LLM_RESPONSE_CACHE", "false").lower() in ["true", "1"]
+
+
+class ResponseCache:
+    """
+    LLM responses keyed by a hash of their exact input text.
+
+    Only byte-identical inputs share a response. Past max_entries the least
+    recently used entry is evicted.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._responses: OrderedDict[bytes, object] = OrderedDict()
+
+    @staticmethod
+    def key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+    def lookup(self, key: bytes):
+        if key not in self._responses:
+            return None
+        self._responses.move_to_end(key)
+        return self._responses[key]
+
+    def add(self, key: bytes, response):
+        self._responses[key] = response
+        self._responses.move_to_end(key)
+        if len(self._responses) > self.max_entries:
+            self._responses.popitem(last=False)
+
+
+_caches = {}
+
+
+def response_cached(namespace: str, enabled: bool = LLM_RESPONSE_CACHE):
+    """
+    Cache an async LLM function by the exact text of its first argument.
+
+    Functions sharing a namespace share their cache.
+    """
+
+    def decorator(func):
+        if not enabled:
+            return func
+        cache = _caches.setdefault(namespace, ResponseCache())
+
+        @wraps(func)
+        async def wrapper(text: str, *args, **kwargs):
+            key = cache.key(text)
+            response = cache.lookup(key)
+            if response is None:
+                response = await func(text, *args, **kwargs)
+                cache.add(key, response)
+            return response
+
+        return wrapper
+
+    return decorator